@@ -1,16 +1,51 @@
-from flask import Flask, render_template, jsonify, request, redirect, url_for, flash, abort, Response
+from flask import Flask, render_template, jsonify, request, redirect, url_for, flash, abort, Response, g, send_file
+from flask import before_render_template, template_rendered
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import sqlite3
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 import os
 import re
-from html import unescape
+import threading
+import time
+import queue
+import atexit
+import math
+import bisect
+import heapq
+import hashlib
+import gzip
+import mmap
+import unicodedata
+import fcntl
+import random
+import cProfile
+from array import array
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from functools import partial, wraps
+from itertools import count, islice
+from concurrent.futures import ThreadPoolExecutor
+from html import escape, unescape
+from html.parser import HTMLParser
+from io import BytesIO
+from urllib.parse import quote, urljoin, urlparse
 import pytz
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.utils import formatdate, make_msgid
 from dotenv import load_dotenv
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
 load_dotenv()
 
 app = Flask(__name__)
@@ -22,16 +57,434 @@ if not SECRET_KEY:
     print(f"Warning: Generated temporary SECRET_KEY: {SECRET_KEY[:10]}...")
 
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-key-for-local')
+
+METRICS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', 0))  # 0 disables profiling
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.05))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+
+class Metrics:
+    """In-process counters and fixed-bucket histograms, rendered as Prometheus text.
+
+    Observations are a bisect and two additions under one lock, so timing
+    the hot path costs microseconds. Every worker keeps its own registry.
+    """
+
+    HELP = {
+        'paradise_request_duration_seconds': ('histogram', 'Request latency by endpoint'),
+        'paradise_requests_total': ('counter', 'Responses by endpoint and status code'),
+        'paradise_span_duration_seconds': ('histogram', 'Time spent in instrumented sections'),
+        'paradise_upstream_requests_total': ('counter', 'Blogger requests by outcome'),
+        'paradise_profiles_total': ('counter', 'Slow request profiles written'),
+        'paradise_cache_stat': ('gauge', 'Cache and queue statistics'),
+    }
+
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = Counter()
+
+    def observe(self, name, labels, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            self._counters[(name, labels)] += amount
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = tuple(labels) + tuple(extra)
+        if not pairs:
+            return ''
+        escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in pairs)
+        return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+    def render(self, gauges=()):
+        with self._lock:
+            histograms = {key: (list(counts), total) for key, (counts, total) in self._histograms.items()}
+            counters = dict(self._counters)
+
+        samples = {}
+        for (name, labels), (counts, total) in sorted(histograms.items()):
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{self._labels(labels, (('le', le),))} {cumulative}")
+            lines.append(f'{name}_sum{self._labels(labels)} {total:.6f}')
+            lines.append(f'{name}_count{self._labels(labels)} {cumulative}')
+        for (name, labels), value in sorted(counters.items()):
+            samples.setdefault(name, []).append(f'{name}{self._labels(labels)} {value}')
+        for name, labels, value in gauges:
+            samples.setdefault(name, []).append(f'{name}{self._labels(labels)} {value}')
+
+        output = []
+        for name, lines in samples.items():
+            kind, text = self.HELP.get(name, ('untyped', name))
+            output.append(f'# HELP {name} {text}')
+            output.append(f'# TYPE {name} {kind}')
+            output.extend(lines)
+        return '\n'.join(output) + '\n'
+
+metrics = Metrics()
+
+@contextmanager
+def span(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe('paradise_span_duration_seconds', (('span', name),), time.perf_counter() - started)
+
+def timed(name):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'
+        metrics.observe('paradise_request_duration_seconds', (('endpoint', endpoint),),
+                        time.perf_counter() - started)
+        metrics.inc('paradise_requests_total', (('endpoint', endpoint), ('status', str(response.status_code))))
+    return response
+
+@before_render_template.connect_via(app)
+def start_render_timer(sender, template, context, **extra):
+    g.render_started = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def record_render_time(sender, template, context, **extra):
+    started = g.pop('render_started', None)
+    if started is not None:
+        metrics.observe('paradise_span_duration_seconds', (('span', 'render_template'),),
+                        time.perf_counter() - started)
+
+# Optional sampled profiling: with PROFILE_SLOW_MS set, a fraction of requests
+# run under cProfile (one at a time per worker) and those slower than the
+# threshold are dumped to PROFILE_DIR for `python -m pstats`.
+profile_lock = threading.Lock()
+
+@app.before_request
+def start_sampled_profile():
+    if PROFILE_SLOW_MS and random.random() < PROFILE_SAMPLE_RATE and profile_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this process
+            profile_lock.release()
+            return
+        g.profiler = profiler
+
+@app.teardown_request
+def finish_sampled_profile(exc=None):
+    profiler = g.pop('profiler', None)
+    if profiler is None:
+        return
+    profiler.disable()
+    profile_lock.release()
+    elapsed_ms = (time.perf_counter() - g.request_started) * 1000
+    if elapsed_ms < PROFILE_SLOW_MS:
+        return
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        endpoint = request.endpoint or 'unmatched'
+        path = os.path.join(PROFILE_DIR, f'{int(time.time() * 1000)}-{os.getpid()}-{endpoint}-{int(elapsed_ms)}ms.prof')
+        profiler.dump_stats(path)
+        metrics.inc('paradise_profiles_total', (('endpoint', endpoint),))
+    except OSError as e:
+        print(f"Profile dump error: {e}")
+
 BLOGGER_URL = os.environ.get('BLOGGER_URL', "https://paradiseofgeeks.blogspot.com")
 BLOGGER_JSON_FEED = f"{BLOGGER_URL}/feeds/posts/default?alt=json"
+BLOGGER_TIMEOUT = float(os.environ.get('BLOGGER_TIMEOUT', 10))
+
+def create_http_session(retries=2):
+    # Pooled, keep-alive sessions per process for all upstream calls. Under
+    # the gevent worker their sockets are cooperative, so a slow upstream only
+    # parks a greenlet instead of pinning a worker thread.
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=retries, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                          allowed_methods=('GET',), raise_on_status=False)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+http = create_http_session()
+# Calls made while a visitor waits get one attempt; retries and their
+# backoff belong to the background syncs.
+request_http = create_http_session(retries=0)
+
+def upstream_get(url, session=None, **kwargs):
+    # Every Blogger call goes through here so latency and failures are counted
+    outcome = 'error'
+    try:
+        with span('upstream_fetch'):
+            response = (session or http).get(url, timeout=BLOGGER_TIMEOUT, **kwargs)
+        outcome = 'error' if response.status_code >= 500 else 'ok'
+        return response
+    except requests.Timeout:
+        outcome = 'timeout'
+        raise
+    finally:
+        metrics.inc('paradise_upstream_requests_total', (('outcome', outcome),))
+
+UNSAFE_URL_RE = re.compile(r'(?:javascript|vbscript|data(?!:image/)):', re.IGNORECASE)
+URL_ATTRIBUTES = frozenset({'href', 'src', 'poster', 'cite'})
+PREVIEW_WORDS = 50
+META_DESCRIPTION_LENGTH = 160
+
+class ContentProcessor(HTMLParser):
+    """Single pass over a post body.
+
+    Collects the plain text, the first remote image and a sanitised copy of
+    the markup. Only the tags and attributes allowlisted below survive, and
+    URL attributes must not use a javascript:-style scheme. Script-like
+    elements, SVG and MathML are dropped with their content; any other tag
+    off the list is dropped but its text is kept.
+    """
+
+    SKIP_CONTENT = frozenset({'script', 'style', 'noscript', 'object', 'applet', 'template',
+                              'svg', 'math', 'textarea', 'select'})
+    ALLOWED_TAGS = frozenset({
+        'a', 'abbr', 'article', 'aside', 'audio', 'b', 'big', 'blockquote', 'br', 'caption',
+        'center', 'cite', 'code', 'col', 'colgroup', 'dd', 'del', 'details', 'dfn', 'div', 'dl',
+        'dt', 'em', 'figcaption', 'figure', 'font', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr',
+        'i', 'iframe', 'img', 'ins', 'kbd', 'li', 'mark', 'ol', 'p', 'picture', 'pre', 'q', 's',
+        'samp', 'section', 'small', 'source', 'span', 'strike', 'strong', 'sub', 'summary',
+        'sup', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'time', 'tr', 'tt', 'u', 'ul',
+        'var', 'video',
+    })
+    GLOBAL_ATTRIBUTES = frozenset({'class', 'id', 'title', 'style', 'dir', 'lang', 'align'})
+    ALLOWED_ATTRIBUTES = {
+        'a': {'href', 'name', 'target', 'rel'},
+        'audio': {'src', 'controls', 'preload', 'loop'},
+        'blockquote': {'cite'},
+        'col': {'span', 'width'},
+        'colgroup': {'span', 'width'},
+        'del': {'cite', 'datetime'},
+        'details': {'open'},
+        'font': {'color', 'face', 'size'},
+        'iframe': {'src', 'width', 'height', 'allow', 'allowfullscreen', 'frameborder', 'loading'},
+        'img': {'src', 'alt', 'width', 'height', 'border', 'loading'},
+        'ins': {'cite', 'datetime'},
+        'ol': {'start', 'type', 'reversed'},
+        'q': {'cite'},
+        'source': {'src', 'type'},
+        'table': {'border', 'cellpadding', 'cellspacing', 'width'},
+        'td': {'colspan', 'rowspan', 'width', 'valign'},
+        'th': {'colspan', 'rowspan', 'scope', 'width', 'valign'},
+        'time': {'datetime'},
+        'ul': {'type'},
+        'video': {'src', 'poster', 'controls', 'preload', 'loop', 'muted', 'width', 'height'},
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.html = []
+        self.text = []
+        self.first_image = None
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, attrs, closed=False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start(tag, attrs, closed=True)
+
+    def _start(self, tag, attrs, closed):
+        if tag in self.SKIP_CONTENT:
+            if not closed:
+                self._skip += 1
+            return
+        if self._skip:
+            return
+
+        self.text.append(' ')
+        if tag not in self.ALLOWED_TAGS:
+            return
+        allowed = self.ALLOWED_ATTRIBUTES.get(tag, ())
+        safe_attrs = [
+            (name, value) for name, value in attrs
+            if (name in self.GLOBAL_ATTRIBUTES or name in allowed)
+            and not (name in URL_ATTRIBUTES and value and UNSAFE_URL_RE.match(''.join(value.split())))
+        ]
+        if tag == 'img' and self.first_image is None:
+            src = dict(safe_attrs).get('src') or ''
+            if src.startswith('//'):
+                src = 'https:' + src
+            if src.startswith(('https://', 'http://')):
+                self.first_image = src
+
+        rendered = ''.join(f' {name}' if value is None else f' {name}="{escape(value)}"'
+                           for name, value in safe_attrs)
+        self.html.append(f"<{tag}{rendered}{' /' if closed else ''}>")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_CONTENT:
+            self._skip = max(self._skip - 1, 0)
+            return
+        if self._skip:
+            return
+        self.text.append(' ')
+        if tag in self.ALLOWED_TAGS:
+            self.html.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        self.text.append(data)
+        self.html.append(data.replace('<', '&lt;').replace('>', '&gt;'))
+
+    def handle_entityref(self, name):
+        self._reference(f'&{name};')
+
+    def handle_charref(self, name):
+        self._reference(f'&#{name};')
+
+    def _reference(self, raw):
+        if self._skip:
+            return
+        self.text.append(unescape(raw))
+        self.html.append(raw)
+
+@timed('html_processing')
+def process_content(html_content):
+    """Derive every field the site needs from a post body in one parse."""
+    parser = ContentProcessor()
+    parser.feed(html_content or '')
+    parser.close()
+
+    words = ''.join(parser.text).split()
+    plain_text = ' '.join(words)
+    return {
+        'content': ''.join(parser.html).strip(),
+        'plain_content': plain_text,
+        'preview': ' '.join(words[:PREVIEW_WORDS]) + '...',
+        'thumbnail': parser.first_image,
+        'meta_description': plain_text[:META_DESCRIPTION_LENGTH],
+    }
+
+THUMBNAIL_SIZES = {'card': (400, 200), 'hero': (1200, 630)}
+THUMBNAIL_EXTENSIONS = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png',
+                        '.gif': 'image/gif', '.webp': 'image/webp'}
+PLACEHOLDER_COLORS = ['4ade80', '38bdf8', 'f472b6', 'f59e0b', '8b5cf6']
+
+def placeholder_thumbnail(title):
+    # Same colour for the same title in every worker, unlike hash()
+    digest = hashlib.sha1((title or '').encode()).digest()
+    color = PLACEHOLDER_COLORS[digest[0] % len(PLACEHOLDER_COLORS)]
+    label = quote((title or 'Post')[:15], safe='')
+    return f"/static/thumbnails/placeholder/{color}/{label}.svg"
+
+def remote_thumbnail(image_url, size='card'):
+    """Local, cacheable URL for a remote image and the key it is stored under."""
+    key = hashlib.sha1(image_url.encode()).hexdigest()[:24]
+    extension = os.path.splitext(urlparse(image_url).path)[1].lower()
+    if extension not in THUMBNAIL_EXTENSIONS:
+        extension = '.jpg'
+    return f"/static/thumbnails/{size}/{key}{extension}", key
+
+def thumbnail_for(image_url, title):
+    if image_url:
+        return remote_thumbnail(image_url)[0]
+    return placeholder_thumbnail(title)
 
 ADSENSE_PUBLISHER_ID = "ca-pub-7442313663988423"  
 ADSENSE_ENABLED = True
 
-def init_db():
-    conn = sqlite3.connect('blog.db')  # Normal path works on Render!
-    c = conn.cursor()
-    
+DATABASE = os.environ.get('DATABASE_PATH', 'blog.db')  # Normal path works on Render!
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+
+class ConnectionPool:
+    """Bounded pool of long-lived SQLite connections in WAL mode.
+
+    Connections are opened lazily up to `size` and tuned once, so requests
+    skip connection setup and reuse each connection's prepared-statement
+    cache. WAL lets readers proceed while a writer holds the lock.
+    """
+
+    PRAGMAS = (
+        'PRAGMA journal_mode = WAL',
+        'PRAGMA synchronous = NORMAL',
+        'PRAGMA cache_size = -8000',
+        'PRAGMA mmap_size = 67108864',
+        'PRAGMA temp_store = MEMORY',
+    )
+
+    def __init__(self, path, size=DB_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # Connections must not cross a fork, so a forked worker starts empty
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, cached_statements=256)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                if self._opened < self.size:
+                    self._opened += 1
+                    try:
+                        return self._connect()
+                    except Exception:
+                        self._opened -= 1
+                        raise
+        return self._idle.get(timeout=30)
+
+    @contextmanager
+    def connection(self):
+        with span('sqlite_wait'):
+            conn = self._acquire()
+        try:
+            with span('sqlite'):
+                yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+db = ConnectionPool(DATABASE)
+
+def create_schema(c):
     c.execute('''
         CREATE TABLE IF NOT EXISTS analytics (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -45,123 +498,990 @@ def init_db():
     c.execute('SELECT COUNT(*) FROM analytics WHERE id = 1')
     if c.fetchone()[0] == 0:
         c.execute('INSERT INTO analytics (id, page_views) VALUES (1, 0)')
-    
-    conn.commit()
-    conn.close()
+
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS contacts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            message TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_type TEXT,
+            event_data TEXT,
+            page_url TEXT,
+            user_agent TEXT,
+            ip_address TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS post_views (
+            post_id TEXT PRIMARY KEY,
+            views INTEGER DEFAULT 0
+        )
+    ''')
+
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS posts (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            preview TEXT,
+            content TEXT,
+            plain_content TEXT,
+            thumbnail TEXT,
+            url TEXT,
+            date TEXT,
+            categories TEXT,
+            published TEXT,
+            updated TEXT,
+            synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_posts_published ON posts (published DESC)')
+
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS feed_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+    migrate_analytics_events(c)
+
+def migrate_analytics_events(c):
+    # Older databases lack the real post/time columns, so add them and
+    # backfill from the JSON payload before creating the rollup tables.
+    c.execute('PRAGMA table_info(analytics_events)')
+    columns = {row[1] for row in c.fetchall()}
+    for column in ('post_id', 'post_title', 'created_at'):
+        if column not in columns:
+            c.execute(f'ALTER TABLE analytics_events ADD COLUMN {column} TEXT')
+    if 'post_id' not in columns:
+        c.execute('''
+            UPDATE analytics_events
+            SET post_id = json_extract(event_data, '$.post_id'),
+                post_title = json_extract(event_data, '$.post_title')
+            WHERE json_valid(event_data)
+        ''')
+    if 'created_at' not in columns and 'timestamp' in columns:
+        c.execute('UPDATE analytics_events SET created_at = timestamp WHERE created_at IS NULL')
+
+    c.execute('CREATE INDEX IF NOT EXISTS idx_analytics_events_type_time ON analytics_events (event_type, created_at)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_analytics_events_time ON analytics_events (created_at)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_analytics_events_post ON analytics_events (post_id)')
+
+    c.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'analytics_daily'")
+    backfill = c.fetchone() is None
+
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_hourly (
+            hour TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            events INTEGER DEFAULT 0,
+            PRIMARY KEY (hour, event_type)
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_daily (
+            day TEXT PRIMARY KEY,
+            total_visits INTEGER DEFAULT 0,
+            unique_visitors INTEGER DEFAULT 0,
+            page_views INTEGER DEFAULT 0,
+            post_views INTEGER DEFAULT 0
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_daily_visitors (
+            day TEXT NOT NULL,
+            ip_address TEXT NOT NULL,
+            PRIMARY KEY (day, ip_address)
+        ) WITHOUT ROWID
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS post_views_daily (
+            day TEXT NOT NULL,
+            post_id TEXT NOT NULL,
+            post_title TEXT,
+            views INTEGER DEFAULT 0,
+            PRIMARY KEY (day, post_id)
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS post_view_totals (
+            post_id TEXT PRIMARY KEY,
+            post_title TEXT,
+            views INTEGER DEFAULT 0
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_post_view_totals_views ON post_view_totals (views DESC)')
+
+    if backfill:
+        c.execute('''
+            INSERT INTO analytics_hourly (hour, event_type, events)
+            SELECT strftime('%Y-%m-%d %H:00', created_at), event_type, COUNT(*)
+            FROM analytics_events WHERE created_at IS NOT NULL AND event_type IS NOT NULL
+            GROUP BY 1, 2
+        ''')
+        c.execute('''
+            INSERT OR IGNORE INTO analytics_daily_visitors (day, ip_address)
+            SELECT DISTINCT DATE(created_at), ip_address
+            FROM analytics_events WHERE created_at IS NOT NULL AND ip_address IS NOT NULL
+        ''')
+        c.execute('''
+            INSERT INTO analytics_daily (day, total_visits, unique_visitors, page_views, post_views)
+            SELECT DATE(created_at), COUNT(*), COUNT(DISTINCT ip_address),
+                   SUM(event_type = 'page_view'), SUM(event_type = 'view_post')
+            FROM analytics_events WHERE created_at IS NOT NULL
+            GROUP BY 1
+        ''')
+        c.execute('''
+            INSERT INTO post_views_daily (day, post_id, post_title, views)
+            SELECT DATE(created_at), post_id, MAX(post_title), COUNT(*)
+            FROM analytics_events
+            WHERE event_type = 'view_post' AND post_id IS NOT NULL AND created_at IS NOT NULL
+            GROUP BY 1, 2
+        ''')
+        c.execute('''
+            INSERT INTO post_view_totals (post_id, post_title, views)
+            SELECT post_id, MAX(post_title), COUNT(*)
+            FROM analytics_events
+            WHERE event_type = 'view_post' AND post_id IS NOT NULL
+            GROUP BY post_id
+        ''')
+
+def reprocess_post_content(c):
+    # Rows synced before the content pipeline hold the raw Blogger body and
+    # no meta description; derive all content fields again from what is stored.
+    c.execute('PRAGMA table_info(posts)')
+    if 'meta_description' not in {row[1] for row in c.fetchall()}:
+        c.execute('ALTER TABLE posts ADD COLUMN meta_description TEXT')
+
+    updates = []
+    for post_id, content, thumbnail in c.execute('SELECT id, content, thumbnail FROM posts').fetchall():
+        fields = process_content(content)
+        updates.append((fields['content'], fields['plain_content'], fields['preview'],
+                        fields['meta_description'], fields['thumbnail'] or thumbnail, post_id))
+    c.executemany('''
+        UPDATE posts
+        SET content = ?, plain_content = ?, preview = ?, meta_description = ?, thumbnail = ?
+        WHERE id = ?
+    ''', updates)
+
+def add_thumbnail_sources(c):
+    # Thumbnails are served from a local cache keyed by the source URL's
+    # hash; remember each source and point stored posts at the local URLs.
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS thumbnail_sources (
+            key TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    sources = []
+    updates = []
+    for post_id, title, thumbnail in c.execute('SELECT id, title, thumbnail FROM posts').fetchall():
+        if thumbnail and thumbnail.startswith('https://via.placeholder.com/'):
+            updates.append((placeholder_thumbnail(title), post_id))
+        elif thumbnail and thumbnail.startswith(('https://', 'http://')):
+            url, key = remote_thumbnail(thumbnail)
+            sources.append((key, thumbnail))
+            updates.append((url, post_id))
+    c.executemany('INSERT OR IGNORE INTO thumbnail_sources (key, source) VALUES (?, ?)', sources)
+    c.executemany('UPDATE posts SET thumbnail = ? WHERE id = ?', updates)
+
+def create_mail_outbox(c):
+    # Outgoing mail is queued here by requests and delivered by MailSender
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS mail_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            contact_id INTEGER,
+            recipient TEXT NOT NULL,
+            reply_to TEXT,
+            subject TEXT NOT NULL,
+            body TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_mail_outbox_due ON mail_outbox (status, next_attempt_at)')
+
+def resanitise_post_content(c):
+    # Stored bodies went through the old blocklist sanitiser; pass them through
+    # the allowlist. Thumbnails already point at the local cache, so keep them.
+    updates = []
+    for post_id, content in c.execute('SELECT id, content FROM posts').fetchall():
+        fields = process_content(content)
+        updates.append((fields['content'], fields['plain_content'], fields['preview'],
+                        fields['meta_description'], post_id))
+    c.executemany('''
+        UPDATE posts
+        SET content = ?, plain_content = ?, preview = ?, meta_description = ?
+        WHERE id = ?
+    ''', updates)
+
+# Schema migrations, applied in order and recorded in PRAGMA user_version.
+# Append new steps; never edit one that has shipped.
+MIGRATIONS = [
+    create_schema,
+    reprocess_post_content,
+    add_thumbnail_sources,
+    create_mail_outbox,
+    resanitise_post_content,
+]
+
+def init_db():
+    with db.connection() as conn:
+        with conn:
+            # Serialise workers that start at the same time
+            conn.execute('BEGIN IMMEDIATE')
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                migration(conn.cursor())
+                conn.execute(f'PRAGMA user_version = {number}')
 
 init_db()
 
-def clean_html_content(html_content):
-    if not html_content:
-        return ""
+@app.cli.command('init-db')
+def init_db_command():
+    init_db()
+    print(f"Database {DATABASE} is at schema version {len(MIGRATIONS)}")
 
-    clean_text = re.sub(r'<[^>]+>', ' ', html_content)
-    clean_text = unescape(clean_text)
-    clean_text = re.sub(r'\s+', ' ', clean_text).strip()
+def parse_blogger_entry(entry):
+    title = entry.get('title', {}).get('$t', 'No Title')
+    
+    content = entry.get('content', {}).get('$t', '')
+    if not content:
+        content = entry.get('summary', {}).get('$t', '')
     
-    return clean_text
+    fields = process_content(content)
 
-def get_blogger_posts():
+    url = BLOGGER_URL
+    for link in entry.get('link', []):
+        if link.get('rel') == 'alternate':
+            url = link.get('href', BLOGGER_URL)
+            break
+    published = entry.get('published', {}).get('$t', '')
     try:
-        response = requests.get(BLOGGER_JSON_FEED, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            posts = []
-            
-            for entry in data.get('feed', {}).get('entry', []):
-                title = entry.get('title', {}).get('$t', 'No Title')
-                
-                content = entry.get('content', {}).get('$t', '')
-                if not content:
-                    content = entry.get('summary', {}).get('$t', '')
-                
-                thumbnail = None
-                import re
-
-                img_patterns = [
-                    r'https://[^"\s]*blogger\.googleusercontent\.com[^"\s]*=w\d+-h\d+',  
-                    r'src="(https://[^"]+\.(jpg|jpeg|png|gif|webp))"',  
-                    r'src=\'(https://[^\']+\.(jpg|jpeg|png|gif|webp))\'', 
-                ]
-                
-                for pattern in img_patterns:
-                    match = re.search(pattern, content, re.IGNORECASE)
-                    if match:
-                        thumbnail = match.group(0) if '=' in match.group(0) else match.group(1)
-                        if 'src="' in thumbnail:
-                            thumbnail = thumbnail.replace('src="', '').replace('"', '')
-                        elif "src='" in thumbnail:
-                            thumbnail = thumbnail.replace("src='", '').replace("'", '')
-                        break
-
-                if not thumbnail:
-                    colors = ['4ade80', '38bdf8', 'f472b6', 'f59e0b', '8b5cf6']
-                    color_index = hash(title) % len(colors)
-                    color = colors[color_index]
-                    thumbnail = f"https://via.placeholder.com/400x200/{color}/0f172a?text={title[:15].replace(' ', '+')}"
-
-                clean_text = re.sub(r'<[^>]+>', ' ', content)
-                clean_text = re.sub(r'\s+', ' ', clean_text).strip()
-                words = clean_text.split()[:50] 
-                preview = ' '.join(words) + '...'
-
-                url = BLOGGER_URL
-                for link in entry.get('link', []):
-                    if link.get('rel') == 'alternate':
-                        url = link.get('href', BLOGGER_URL)
-                        break
-                published = entry.get('published', {}).get('$t', '')
-                try:
-                    date_obj = datetime.fromisoformat(published.replace('Z', '+00:00'))
-                except:
-                    date_obj = datetime.now()
-                
-                posts.append({
-                    'id': entry.get('id', {}).get('$t', '').split('.')[-1],
-                    'title': title,
-                    'preview': preview,
-                    'content': content,
-                    'plain_content': clean_text,  
-                    'thumbnail': thumbnail, 
-                    'url': url,
-                    'date': date_obj.strftime('%B %d, %Y'),
-                    'categories': extract_categories(entry)  
-                })
-            
-            return posts[:10]
-        return []
-    except Exception as e:
-        print(f"Blogger fetch error: {e}")
-        return [{
-            'id': '1',
-            'title': 'Master Linux Commands',
-            'preview': 'Learn essential Linux commands for beginners. Master the terminal...',
-            'content': '<p>Sample content</p>',
-            'plain_content': 'Sample content',
-            'thumbnail': 'https://via.placeholder.com/400x200/4ade80/0f172a?text=Linux+Tutorial',
-            'date': 'January 28, 2024',
-            'categories': ['Linux', 'Tutorial']
-        }]
-    
-def create_plain_excerpt(html_content):
-    if not html_content:
-        return ""
-    
-    text = re.sub(r'<[^>]+>', ' ', html_content)
-    text = re.sub(r'\s+', ' ', text).strip()
-    text = unescape(text)
+        date_obj = datetime.fromisoformat(published.replace('Z', '+00:00'))
+    except:
+        date_obj = datetime.now()
+    updated = entry.get('updated', {}).get('$t', '') or published
     
-    return text
+    return {
+        'id': entry.get('id', {}).get('$t', '').split('.')[-1],
+        'title': title,
+        'preview': fields['preview'],
+        'content': fields['content'],
+        'plain_content': fields['plain_content'],
+        'meta_description': fields['meta_description'],
+        'thumbnail': thumbnail_for(fields['thumbnail'], title),
+        'thumbnail_source': fields['thumbnail'],
+        'url': url,
+        'date': date_obj.strftime('%B %d, %Y'),
+        'categories': extract_categories(entry),
+        'published': published,
+        'updated': updated
+    }
+
+FEED_PAGE_SIZE = int(os.environ.get('FEED_PAGE_SIZE', 150))
+FEED_FETCH_CONCURRENCY = int(os.environ.get('FEED_FETCH_CONCURRENCY', 4))
+FEED_FULL_SYNC_INTERVAL = int(os.environ.get('FEED_FULL_SYNC_INTERVAL', 6 * 3600))
+
+def fetch_feed_page(start_index, params=None, headers=None):
+    page_params = {'start-index': start_index, 'max-results': FEED_PAGE_SIZE}
+    page_params.update(params or {})
+    return upstream_get(BLOGGER_JSON_FEED, params=page_params, headers=headers)
+
+def fetch_feed_entries(start_index, params=None):
+    response = fetch_feed_page(start_index, params)
+    response.raise_for_status()
+    return response.json().get('feed', {}).get('entry', [])
+
+def fetch_blogger_posts(updated_min=None, etag=None):
+    """Walk the whole feed page by page.
+
+    Returns (posts, etag), or (None, etag) when Blogger answers the
+    conditional request with 304 Not Modified.
+    """
+    params = {}
+    if updated_min:
+        params = {'updated-min': updated_min, 'orderby': 'updated'}
+    headers = {'If-None-Match': etag} if etag else None
+
+    response = fetch_feed_page(1, params, headers)
+    if response.status_code == 304:
+        return None, etag
+    response.raise_for_status()
+
+    feed = response.json().get('feed', {})
+    entries = feed.get('entry', [])
+    total = int(feed.get('openSearch$totalResults', {}).get('$t', len(entries)) or 0)
+
+    # Remaining pages are independent, so fetch them with bounded parallelism
+    starts = range(1 + FEED_PAGE_SIZE, total + 1, FEED_PAGE_SIZE)
+    if starts:
+        with ThreadPoolExecutor(max_workers=FEED_FETCH_CONCURRENCY) as pool:
+            for page in pool.map(lambda start: fetch_feed_entries(start, params), starts):
+                entries.extend(page)
+
+    return [parse_blogger_entry(entry) for entry in entries], response.headers.get('ETag')
+
+POST_COLUMNS = ['id', 'title', 'preview', 'content', 'plain_content', 'thumbnail',
+                'url', 'date', 'categories', 'published', 'updated', 'meta_description']
+
+class Post:
+    """Immutable post: slotted summary fields plus a lazily loaded body.
+
+    List pages, search results, the APIs and the sitemap only read the
+    summary. `content` and `plain_content` come from `body`, which is either
+    a dict or a callable that loads it from the database or the feed snapshot
+    on each access, so article bodies are not held by the post set.
+    Item access (`post['title']`, `post.get(...)`) mirrors the dicts the
+    rest of the app and the templates were written against.
+    """
+
+    SUMMARY_FIELDS = ('id', 'title', 'preview', 'thumbnail', 'url', 'date', 'categories',
+                      'published', 'updated', 'meta_description')
+    BODY_FIELDS = ('content', 'plain_content')
+    FIELDS = frozenset(SUMMARY_FIELDS + BODY_FIELDS)
+
+    __slots__ = SUMMARY_FIELDS + ('_body',)
+
+    def __init__(self, body=None, **fields):
+        for name in self.SUMMARY_FIELDS:
+            object.__setattr__(self, name, fields.get(name))
+        object.__setattr__(self, 'categories', tuple(fields.get('categories') or ()))
+        if body is None and any(name in fields for name in self.BODY_FIELDS):
+            body = {name: fields.get(name) or '' for name in self.BODY_FIELDS}
+        object.__setattr__(self, '_body', body)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Post objects are immutable")
+
+    def body(self):
+        body = self._body
+        return (body() if callable(body) else body) or {}
+
+    @property
+    def content(self):
+        return self.body().get('content') or ''
+
+    @property
+    def plain_content(self):
+        return self.body().get('plain_content') or ''
+
+    def loaded(self):
+        # Copy with the body read once and kept, for bulk index builds
+        return Post(body=self.body(), **self.summary())
+
+    def summary(self):
+        return {name: getattr(self, name) for name in self.SUMMARY_FIELDS}
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def get(self, key, default=None):
+        if key not in self.FIELDS:
+            return default
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"Post(id={self.id!r}, title={self.title!r})"
+
+def set_feed_state(values):
+    with db.connection() as conn, conn:
+        conn.executemany('INSERT OR REPLACE INTO feed_state (key, value) VALUES (?, ?)',
+                         [(key, str(value)) for key, value in values.items()])
+
+def get_feed_state(key, default=None):
+    with db.connection() as conn:
+        row = conn.execute('SELECT value FROM feed_state WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else default
+
+def store_posts(posts, prune=False):
+    # Upsert keyed on the Blogger entry id; rows whose 'updated' stamp did not
+    # change are left alone so a refresh only rewrites edited posts. A full
+    # sync passes prune=True to drop posts that were deleted on Blogger.
+    rows = [
+        tuple(json.dumps(post.get(col, [])) if col == 'categories' else post.get(col)
+              for col in POST_COLUMNS)
+        for post in posts
+    ]
+    assignments = ', '.join(f'{col} = excluded.{col}' for col in POST_COLUMNS[1:])
+
+    with db.connection() as conn, conn:
+        before = conn.total_changes
+        conn.executemany(f'''
+            INSERT INTO posts ({', '.join(POST_COLUMNS)})
+            VALUES ({', '.join('?' for _ in POST_COLUMNS)})
+            ON CONFLICT(id) DO UPDATE SET {assignments}, synced_at = CURRENT_TIMESTAMP
+            WHERE posts.updated IS NOT excluded.updated
+        ''', rows)
+        if prune and posts:
+            conn.execute('DELETE FROM posts WHERE id NOT IN (SELECT value FROM json_each(?))',
+                         (json.dumps([post['id'] for post in posts]),))
+        # Counted before the thumbnail rows, so the result is posts only
+        changed = conn.total_changes - before
+        store_thumbnail_sources(conn, posts)
+        return changed
 
-def extract_first_image(html_content):
-    if not html_content:
+def store_thumbnail_sources(conn, posts):
+    conn.executemany('INSERT OR IGNORE INTO thumbnail_sources (key, source) VALUES (?, ?)', [
+        (remote_thumbnail(post['thumbnail_source'])[1], post['thumbnail_source'])
+        for post in posts if post.get('thumbnail_source')
+    ])
+
+def load_stored_posts(bodies=False):
+    # Summaries only by default; each post reads its body from the table on demand
+    columns = Post.SUMMARY_FIELDS + (Post.BODY_FIELDS if bodies else ())
+    with db.connection() as conn:
+        c = conn.cursor()
+        c.row_factory = sqlite3.Row
+        c.execute(f'SELECT {", ".join(columns)} FROM posts ORDER BY published DESC')
+        rows = c.fetchall()
+
+    posts = []
+    for row in rows:
+        fields = dict(row)
+        fields['categories'] = json.loads(fields['categories'] or '[]')
+        body = None if bodies else partial(load_post_body, fields['id'])
+        posts.append(Post(body=body, **fields))
+    return posts
+
+def load_post_body(post_id):
+    with db.connection() as conn:
+        row = conn.execute('SELECT content, plain_content FROM posts WHERE id = ?', (post_id,)).fetchone()
+    return {'content': row[0], 'plain_content': row[1]} if row else {}
+
+def stored_posts_age():
+    last_sync = get_feed_state('last_sync')
+    if last_sync is None:
         return None
-    
-    img_match = re.search(r'<img[^>]+src="([^">]+)"', html_content)
-    if img_match:
-        return img_match.group(1)
-    
-    return None
+    return time.time() - float(last_sync)
+
+def sync_blogger_posts(force=False):
+    # Another worker may have refreshed the shared table already; reuse its
+    # copy instead of hitting Blogger again.
+    age = None if force else stored_posts_age()
+    if age is not None and age < FEED_CACHE_TTL:
+        posts = load_stored_posts()
+        if posts:
+            return posts
+
+    # Full walks run every FEED_FULL_SYNC_INTERVAL to pick up deletions; in
+    # between, only entries updated since the newest stored one are pulled.
+    last_full_sync = float(get_feed_state('last_full_sync', 0))
+    full = time.time() - last_full_sync >= FEED_FULL_SYNC_INTERVAL
+    updated_min = None if full else get_feed_state('last_updated')
+    etag = None if full else get_feed_state('feed_etag')
+
+    posts, etag = fetch_blogger_posts(updated_min, etag)
+    state = {'last_sync': time.time()}
+    if posts is not None:
+        changed = store_posts(posts, prune=full)
+        if changed:
+            print(f"Blogger sync: {changed} posts updated")
+        if etag:
+            state['feed_etag'] = etag
+        if full:
+            state['last_full_sync'] = state['last_sync']
+        newest = max((post['updated'] for post in posts if post.get('updated')), default=None)
+        if newest and newest > (updated_min or ''):
+            state['last_updated'] = newest
+    set_feed_state(state)
+    return load_stored_posts()
+
+FALLBACK_POSTS = [Post(
+    id='1',
+    title='Master Linux Commands',
+    preview='Learn essential Linux commands for beginners. Master the terminal...',
+    content='<p>Sample content</p>',
+    plain_content='Sample content',
+    meta_description='Sample content',
+    thumbnail=placeholder_thumbnail('Linux Tutorial'),
+    date='January 28, 2024',
+    categories=['Linux', 'Tutorial']
+)]
+
+FEED_CACHE_TTL = int(os.environ.get('FEED_CACHE_TTL', 300))
+FEED_CACHE_RETRY = int(os.environ.get('FEED_CACHE_RETRY', 30))
+# Who talks to Blogger:
+#   thread  - a background refresher in each worker; requests only read the store
+#   cron    - only `flask refresh-feed`; workers reload what it stored
+#   request - the feed cache syncs from Blogger itself when it goes stale
+FEED_REFRESH_MODE = os.environ.get('FEED_REFRESH_MODE', 'thread')
+FEED_REFRESH_INTERVAL = int(os.environ.get('FEED_REFRESH_INTERVAL', FEED_CACHE_TTL))
+FEED_REFRESH_MAX_BACKOFF = int(os.environ.get('FEED_REFRESH_MAX_BACKOFF', 1800))
+FEED_BREAKER_THRESHOLD = int(os.environ.get('FEED_BREAKER_THRESHOLD', 3))
+FEED_REFRESH_LEASE = int(os.environ.get('FEED_REFRESH_LEASE', 120))
+
+class FeedCache:
+    """Per-process cache around a feed loader.
+
+    Fresh data is served straight from memory. Once the TTL expires the stale
+    copy keeps being served while a single background thread refreshes it, and
+    a cold cache makes concurrent callers wait on one shared fetch.
+    """
+
+    def __init__(self, loader, ttl=FEED_CACHE_TTL, retry_after=FEED_CACHE_RETRY, signature=None):
+        self.loader = loader
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.signature = signature
+        self.version = None
+        self._lock = threading.Lock()
+        self._data = None
+        self._fetched_at = 0.0
+        self._expires_at = 0.0
+        self._failed_at = None
+        self._refreshing = False
+        self.listeners = []
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def get(self):
+        data = self._data
+        if data is not None:
+            if time.monotonic() < self._expires_at:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh_in_background()
+            return data
+
+        with self._lock:
+            if self._data is None:
+                self.misses += 1
+                if self._failed_at is None or time.monotonic() - self._failed_at >= self.retry_after:
+                    self._refresh()
+            else:
+                self.hits += 1
+            return self._data
+
+    def prime(self, data, age=0.0):
+        # Seed the cache from a local copy; it is refreshed once `age` runs past the TTL
+        self._publish(data)
+        self._fetched_at = time.monotonic() - age
+        self._expires_at = self._fetched_at + self.ttl
+        self._failed_at = None
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self._refresh()
+        finally:
+            self._refreshing = False
+
+    def _refresh(self):
+        try:
+            data = self.loader()
+        except Exception as e:
+            print(f"Blogger fetch error: {e}")
+            self.errors += 1
+            self._failed_at = time.monotonic()
+            # Keep serving the stale copy and try again after retry_after
+            self._expires_at = self._failed_at + self.retry_after
+            return
+        self._publish(data)
+        self._fetched_at = time.monotonic()
+        self._expires_at = self._fetched_at + self.ttl
+        self.refreshes += 1
+
+    def _publish(self, data):
+        version = self.signature(data) if self.signature else str(self.refreshes)
+        if self._data is not None and version == self.version:
+            # Same post set: keep the current snapshot and the indexes built on it
+            return
+        # Let derived indexes catch up on the refreshing thread before
+        # requests start seeing the new data.
+        for listener in self.listeners:
+            try:
+                listener(data)
+            except Exception as e:
+                print(f"Feed listener error: {e}")
+        # Data first, then version: a reader that sees the new version is
+        # guaranteed to see the new data too.
+        self._data = data
+        self.version = version
+
+    def stats(self):
+        age = time.monotonic() - self._fetched_at if self._data is not None else None
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'errors': self.errors,
+            'refreshing': self._refreshing,
+            'age_seconds': round(age, 1) if age is not None else None,
+            'ttl_seconds': self.ttl
+        }
+
+def post_set_version(posts):
+    digest = hashlib.sha1()
+    for post in posts:
+        digest.update(f"{post['id']}:{post.get('updated', '')}\n".encode())
+    return digest.hexdigest()[:16]
+
+def load_feed_snapshot():
+    # Loader for the thread and cron modes: map the shared snapshot file (or
+    # build it from the stored posts) and never call Blogger from a request.
+    snapshot = feed_snapshots.current()
+    if snapshot is not None:
+        return snapshot.posts
+    posts = load_stored_posts()
+    if not posts:
+        raise LookupError("No feed snapshot stored yet")
+    # These posts may predate a sync that is being published right now, so
+    # only fill the gap; never replace a snapshot another process wrote.
+    return publish_feed_snapshot(posts, replace=False)
+
+feed_cache = FeedCache(sync_blogger_posts if FEED_REFRESH_MODE == 'request' else load_feed_snapshot,
+                       signature=post_set_version)
+
+class CircuitBreaker:
+    """Consecutive-failure breaker around Blogger syncs.
+
+    State lives in feed_state, so every worker and cron run sees the same
+    breaker. After `threshold` failures in a row it opens for a jittered,
+    exponentially growing period; the first success closes it again.
+    """
+
+    def __init__(self, threshold=FEED_BREAKER_THRESHOLD, base_delay=FEED_CACHE_RETRY,
+                 max_delay=FEED_REFRESH_MAX_BACKOFF):
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, failures):
+        delay = min(self.max_delay, self.base_delay * 2 ** max(failures - 1, 0))
+        return random.uniform(delay / 2, delay)
+
+    def failures(self):
+        return int(get_feed_state('breaker_failures', 0))
+
+    def open_for(self):
+        return max(0.0, float(get_feed_state('breaker_open_until', 0)) - time.time())
+
+    def allow(self):
+        return self.open_for() == 0
+
+    def record_success(self):
+        if self.failures():
+            set_feed_state({'breaker_failures': 0, 'breaker_open_until': 0})
+
+    def record_failure(self):
+        failures = self.failures() + 1
+        state = {'breaker_failures': failures}
+        if failures >= self.threshold:
+            state['breaker_open_until'] = time.time() + self.backoff(failures)
+        set_feed_state(state)
+        return failures
+
+feed_breaker = CircuitBreaker()
+
+def claim_feed_refresh(lease=FEED_REFRESH_LEASE):
+    # One worker syncs at a time; the others reuse what it stores
+    with db.connection() as conn, conn:
+        conn.execute('BEGIN IMMEDIATE')
+        row = conn.execute("SELECT value FROM feed_state WHERE key = 'refresh_lease'").fetchone()
+        now = time.time()
+        if row and float(row[0]) > now:
+            return False
+        conn.execute("INSERT OR REPLACE INTO feed_state (key, value) VALUES ('refresh_lease', ?)",
+                     (str(now + lease),))
+        return True
+
+def refresh_feed_snapshot(force=False):
+    """Sync from Blogger unless the breaker is open.
+
+    Returns the stored posts, or None when the breaker skipped the attempt.
+    While another worker holds the refresh lease this returns the shared
+    snapshot it publishes instead, which may be empty on a cold start.
+    """
+    if not feed_breaker.allow():
+        return None
+    if not force and not claim_feed_refresh():
+        try:
+            return load_feed_snapshot()
+        except LookupError:
+            return []
+    try:
+        posts = sync_blogger_posts(force=force)
+    except Exception:
+        feed_breaker.record_failure()
+        raise
+    finally:
+        set_feed_state({'refresh_lease': 0})
+    feed_breaker.record_success()
+    return posts
+
+class FeedRefresher:
+    """Background thread that does all of a worker's Blogger traffic.
+
+    Each successful sync is published to the feed cache in one step, so a
+    request sees either the old snapshot or the new one. While Blogger fails
+    the last good snapshot stays in place and retries back off with jitter.
+    """
+
+    def __init__(self, cache, interval=FEED_REFRESH_INTERVAL, breaker=feed_breaker):
+        self.cache = cache
+        self.interval = interval
+        self.breaker = breaker
+        self._lock = threading.Lock()
+        self._pid = None
+        self.runs = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.skipped = 0
+        self.last_success = None
+
+    def start(self):
+        # Started per process on first use, so a forked worker gets its own thread
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name='feed-refresher', daemon=True).start()
+
+    def _run(self):
+        # Stagger workers so they do not all hit the shared table at once
+        delay = random.uniform(0, 2)
+        while True:
+            time.sleep(delay)
+            delay = self.run_once()
+
+    def run_once(self):
+        """Refresh once and return how long to wait before the next run."""
+        self.runs += 1
+        try:
+            posts = refresh_feed_snapshot()
+        except Exception as e:
+            print(f"Feed refresh error: {e}")
+            self.failures += 1
+            self.consecutive_failures += 1
+            return self.breaker.open_for() or self.breaker.backoff(self.consecutive_failures)
+
+        if posts is None:
+            self.skipped += 1
+            return self.breaker.open_for() + random.uniform(0, 5)
+        self.consecutive_failures = 0
+        if not posts:
+            # Another worker is running the first sync; check back shortly
+            return random.uniform(1, 3)
+        self.last_success = time.time()
+        self.cache.prime(publish_feed_snapshot(posts))
+        return random.uniform(0.9, 1.1) * self.interval
+
+    def stats(self):
+        return {
+            'mode': FEED_REFRESH_MODE,
+            'running': self._pid == os.getpid(),
+            'runs': self.runs,
+            'failures': self.failures,
+            'consecutive_failures': self.consecutive_failures,
+            'skipped_breaker_open': self.skipped,
+            'last_success_age_seconds': round(time.time() - self.last_success, 1) if self.last_success else None
+        }
+
+feed_refresher = FeedRefresher(feed_cache)
+
+@app.before_request
+def start_feed_refresher():
+    if FEED_REFRESH_MODE == 'thread':
+        feed_refresher.start()
+
+@app.cli.command('refresh-feed')
+def refresh_feed_command():
+    """Sync posts from Blogger once; for a cron job with FEED_REFRESH_MODE=cron."""
+    try:
+        posts = refresh_feed_snapshot(force=True)
+    except Exception as e:
+        raise SystemExit(f"Feed refresh failed: {e}")
+    if posts is None:
+        print(f"Circuit breaker open; skipping for another {feed_breaker.open_for():.0f}s")
+        return
+    publish_feed_snapshot(posts)
+    print(f"Stored {len(posts)} posts (version {post_set_version(posts)})")
+
+def warm_feed_cache():
+    try:
+        if FEED_REFRESH_MODE == 'request':
+            posts = load_stored_posts()
+        else:
+            posts = load_feed_snapshot()
+        if posts:
+            feed_cache.prime(posts, stored_posts_age() or FEED_CACHE_TTL)
+    except LookupError:
+        pass
+    except Exception as e:
+        print(f"Error loading stored posts: {e}")
+
+@timed('get_blogger_posts')
+def get_blogger_posts():
+    posts = feed_cache.get()
+    if posts is None:
+        return FALLBACK_POSTS
+    return posts
+
+def get_feed_version():
+    return feed_cache.version or 'fallback'
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how', 'in', 'is',
+    'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what', 'with', 'you', 'your'
+}
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or '').lower()) if t not in STOPWORDS]
+
+class SearchIndex:
+    """In-memory inverted index with BM25 ranking over the post set.
+
+    sync() diffs the posts it is given against the indexed ones by id and
+    'updated' stamp, so only new, edited or deleted posts touch the index.
+    """
+
+    FIELD_WEIGHTS = (('title', 3), ('categories', 2), ('plain_content', 1))
+    K1 = 1.2
+    B = 0.75
+    PREFIX_WEIGHT = 0.5
+    MAX_PREFIX_TERMS = 50
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._source = None
+        self.posts = {}
+        self.versions = {}
+        self.doc_terms = {}
+        self.doc_lengths = {}
+        self.postings = {}
+        self.vocabulary = []
+        self.total_length = 0
+
+    def sync(self, posts):
+        if posts is self._source or getattr(posts, 'snapshot', None) is not None:
+            # A mapped snapshot ships this index prebuilt
+            return
+        with self._lock:
+            if posts is self._source:
+                return
+            current = {post['id']: post for post in posts}
+            for post_id in list(self.posts):
+                post = current.get(post_id)
+                if post is None or post.get('updated') != self.versions[post_id]:
+                    self._remove(post_id)
+            vocabulary_changed = False
+            for post_id, post in current.items():
+                if post_id in self.posts:
+                    self.posts[post_id] = post
+                else:
+                    vocabulary_changed |= self._add(post)
+            if vocabulary_changed or len(self.vocabulary) != len(self.postings):
+                self.vocabulary = sorted(self.postings)
+            self._source = posts
+
+    def _add(self, post):
+        terms = Counter()
+        for field, weight in self.FIELD_WEIGHTS:
+            value = post.get(field) or ''
+            if isinstance(value, (list, tuple)):
+                value = ' '.join(value)
+            for term in tokenize(value):
+                terms[term] += weight
+
+        post_id = post['id']
+        new_terms = False
+        for term, freq in terms.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                new_terms = True
+            self.postings[term][post_id] = freq
+        self.posts[post_id] = post
+        self.versions[post_id] = post.get('updated')
+        self.doc_terms[post_id] = terms
+        self.doc_lengths[post_id] = sum(terms.values())
+        self.total_length += self.doc_lengths[post_id]
+        return new_terms
+
+    def _remove(self, post_id):
+        for term in self.doc_terms.pop(post_id, {}):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(post_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(post_id, 0)
+        self.posts.pop(post_id, None)
+        self.versions.pop(post_id, None)
+
+    def _expand(self, token):
+        # Exact term plus vocabulary terms that start with it, for as-you-type queries
+        matches = []
+        start = bisect.bisect_left(self.vocabulary, token)
+        for term in self.vocabulary[start:start + self.MAX_PREFIX_TERMS]:
+            if not term.startswith(token):
+                break
+            matches.append((term, 1.0 if term == token else self.PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query):
+        """Return the matching posts ranked by BM25 score, best first."""
+        with self._lock:
+            doc_count = len(self.posts)
+            if not doc_count:
+                return []
+            avg_length = self.total_length / doc_count
+            scores = Counter()
+            for token in set(tokenize(query)):
+                for term, weight in self._expand(token):
+                    docs = self.postings.get(term)
+                    if not docs:
+                        continue
+                    idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+                    for post_id, freq in docs.items():
+                        norm = self.K1 * (1 - self.B + self.B * self.doc_lengths[post_id] / avg_length)
+                        scores[post_id] += weight * idf * freq * (self.K1 + 1) / (freq + norm)
+            return [self.posts[post_id] for post_id, _ in scores.most_common()]
+
+search_index = SearchIndex()
+feed_cache.listeners.append(search_index.sync)
+
+def search_posts(query):
+    posts = get_blogger_posts()
+    snapshot = getattr(posts, 'snapshot', None)
+    if snapshot is not None:
+        return snapshot.search(query)
+    search_index.sync(posts)
+    return search_index.search(query)
 
 def extract_category(entry):
     try:
@@ -175,66 +1495,720 @@ def extract_category(entry):
         return "Tech"
 
 
-def get_paginated_posts(page=1, per_page=6):
-    posts = get_blogger_posts()
-    start = (page - 1) * per_page
-    end = start + per_page
-    return posts[start:end]
+def get_paginated_posts(page=1, per_page=6):
+    posts = get_blogger_posts()
+    start = (page - 1) * per_page
+    end = start + per_page
+    return posts[start:end]
+
+class RelatedPostsIndex:
+    """Precomputed top-k neighbours for every post.
+
+    Similarity is the cosine of TF-IDF vectors over title and plain_content,
+    plus a bonus for shared categories. It is recomputed once per post set,
+    so a lookup is a dictionary access.
+    """
+
+    TOP_K = 6
+    MAX_TERMS = 25
+    MAX_DF_RATIO = 0.5
+    CATEGORY_WEIGHT = 0.25
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (source list, posts by id, neighbours), replaced in one assignment
+        # so readers never see the lists of one build with the posts of another
+        self._state = (None, {}, {})
+
+    def sync(self, posts):
+        if posts is self._state[0] or getattr(posts, 'snapshot', None) is not None:
+            return
+        with self._lock:
+            if posts is self._state[0]:
+                return
+            neighbours = self._build(posts)
+            self._state = (posts, {post['id']: post for post in posts}, neighbours)
+
+    def _build(self, posts):
+        term_counts = {}
+        df = Counter()
+        for post in posts:
+            terms = Counter(tokenize(post.get('plain_content')))
+            for term in tokenize(post.get('title')):
+                terms[term] += 2
+            term_counts[post['id']] = terms
+            df.update(terms.keys())
+
+        # Terms found in a single post cannot link two posts. Common topic
+        # words are what relate posts, so IDF only down-weights them; just the
+        # near-universal terms (in over half the posts) are dropped.
+        doc_count = len(posts)
+        max_df = max(int(doc_count * self.MAX_DF_RATIO), 10)
+        postings = {}
+        for post_id, terms in term_counts.items():
+            weights = {
+                term: (1 + math.log(freq)) * math.log(doc_count / df[term])
+                for term, freq in terms.items()
+                if 1 < df[term] <= max_df
+            }
+            top = heapq.nlargest(self.MAX_TERMS, weights.items(), key=lambda item: item[1])
+            norm = math.sqrt(sum(weight * weight for _, weight in top)) or 1.0
+            for term, weight in top:
+                postings.setdefault(term, []).append((post_id, weight / norm))
+
+        vectors = {}
+        for term, docs in postings.items():
+            for post_id, weight in docs:
+                vectors.setdefault(post_id, []).append((term, weight))
+
+        categories = {post['id']: {cat.lower() for cat in post.get('categories', [])} for post in posts}
+        by_category = {}
+        for post in posts:
+            for cat in categories[post['id']]:
+                by_category.setdefault(cat, []).append(post['id'])
+
+        neighbours = {}
+        for post in posts:
+            post_id = post['id']
+            scores = Counter()
+            for term, weight in vectors.get(post_id, []):
+                for other_id, other_weight in postings[term]:
+                    scores[other_id] += weight * other_weight
+
+            own_categories = categories[post_id]
+            if len(scores) < self.TOP_K:
+                for cat in own_categories:
+                    for other_id in by_category[cat][:self.TOP_K]:
+                        scores.setdefault(other_id, 0.0)
+            scores.pop(post_id, None)
+
+            for other_id in scores:
+                other_categories = categories[other_id]
+                if own_categories and other_categories:
+                    overlap = len(own_categories & other_categories) / len(own_categories | other_categories)
+                    scores[other_id] += self.CATEGORY_WEIGHT * overlap
+
+            neighbours[post_id] = [
+                other_id for other_id, score in scores.most_common(self.TOP_K) if score > 0
+            ]
+        return neighbours
+
+    def related(self, post_id, limit=3):
+        _, posts, neighbours = self._state
+        return [posts[other_id] for other_id in neighbours.get(post_id, [])[:limit]]
+
+related_index = RelatedPostsIndex()
+feed_cache.listeners.append(related_index.sync)
+
+def get_related_posts(current_post_id, all_posts, limit=3):
+    snapshot = getattr(all_posts, 'snapshot', None)
+    if snapshot is not None:
+        return snapshot.related(current_post_id, limit)
+    # Built by the feed listener; a request never pays for a rebuild, even
+    # when it holds an older post list than the index.
+    return related_index.related(current_post_id, limit)
+
+# Posts per page on /blog and the category pages
+BLOG_PAGE_SIZE = 12
+
+def category_key(name):
+    # Case- and width-insensitive but otherwise exact, so non-ASCII names keep
+    # a key and names like C# and C++ stay apart; url_for quotes it in links.
+    return ' '.join(unicodedata.normalize('NFKC', name or '').casefold().split())
+
+class CategoryIndex:
+    """Category key -> positions of its posts in the feed's post list.
+
+    Built once per post set. The post list is already newest first, so each
+    position list is in display order, and a page of a category is a slice
+    of it rather than a scan over every post.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = (None, {}, {})
+
+    def sync(self, posts):
+        if posts is self._state[0]:
+            return self._state
+        with self._lock:
+            if posts is not self._state[0]:
+                self._state = self._build(posts)
+            return self._state
+
+    def _build(self, posts):
+        names = {}
+        positions = {}
+        for position, post in enumerate(posts):
+            for name in post.get('categories', []):
+                key = category_key(name)
+                if not key:
+                    continue
+                names.setdefault(key, name)
+                slot = positions.setdefault(key, array('i'))
+                # A post listing a category twice is counted once
+                if not slot or slot[-1] != position:
+                    slot.append(position)
+        return posts, names, positions
+
+    def counts(self, posts):
+        """Display name -> post count, sorted by name."""
+        _, names, positions = self.sync(posts)
+        return {names[key]: len(positions[key]) for key in sorted(names, key=names.get)}
+
+    def name(self, posts, key):
+        return self.sync(posts)[1].get(key)
+
+    def page(self, posts, key, offset, limit):
+        """Posts offset..offset+limit of a category and the category's size."""
+        _, _, positions = self.sync(posts)
+        slot = positions.get(key)
+        if slot is None:
+            return [], 0
+        return [posts[position] for position in slot[offset:offset + limit]], len(slot)
+
+category_index = CategoryIndex()
+feed_cache.listeners.append(category_index.sync)
+
+FEED_SNAPSHOT_PATH = os.environ.get('FEED_SNAPSHOT_PATH', f'{DATABASE}.snapshot')
+
+class SnapshotPostList(list):
+    # The post list handed out by the feed cache, tagged with its snapshot
+    def __init__(self, posts, snapshot):
+        super().__init__(posts)
+        self.snapshot = snapshot
+
+class FeedSnapshot:
+    """Read-only, memory-mapped post set with prebuilt search and related indexes.
+
+    One worker serialises the posts and both indexes into a single file;
+    every worker maps it, so the pages are shared through the OS page cache
+    instead of being copied into each process. Offsets and postings are
+    read in place through memoryview casts, and post bodies are decoded
+    only when a page asks for them.
+
+    Layout: MAGIC, a u32 header length, a JSON header naming each section's
+    offset, length and array format, then the 8-byte aligned sections.
+    Section offsets count from the aligned end of the header.
+    """
+
+    MAGIC = b'PGSNAP01'
+    NO_NEIGHBOUR = 0xFFFFFFFF
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(self.MAGIC)] != self.MAGIC:
+            raise ValueError(f"{path} is not a feed snapshot")
+        header_start = len(self.MAGIC) + 4
+        header_length = int.from_bytes(self._mmap[len(self.MAGIC):header_start], 'little')
+        header = json.loads(self._mmap[header_start:header_start + header_length])
+        data_start = self._align(header_start + header_length)
+        self.version = header['version']
+        self.schema = header.get('schema')
+        self.avg_length = header['avg_length']
+        self.size = len(self._mmap)
+
+        view = memoryview(self._mmap)
+        self._sections = {
+            name: view[data_start + offset:data_start + offset + length].cast(fmt)
+            for name, (offset, length, fmt) in header['sections'].items()
+        }
+        self.posts = SnapshotPostList(
+            (Post(body=partial(self.body, index), **json.loads(bytes(self._blob('summaries', index))))
+             for index in range(header['count'])),
+            self
+        )
+        self.positions = {post['id']: index for index, post in enumerate(self.posts)}
+
+    @classmethod
+    def write(cls, path, posts):
+        """Serialise posts and their indexes to `path` via an atomic rename."""
+        posts = [post.loaded() for post in posts]
+        search = SearchIndex()
+        search.sync(posts)
+        neighbours = RelatedPostsIndex()._build(posts)
+        positions = {post['id']: index for index, post in enumerate(posts)}
+
+        summaries = [json.dumps(post.summary(), separators=(',', ':')).encode() for post in posts]
+        bodies = [json.dumps(post.body(), separators=(',', ':')).encode() for post in posts]
+        # Byte order matches str order for UTF-8, so readers can bisect raw bytes
+        terms = sorted(term.encode() for term in search.postings)
+        posting_docs = array('I')
+        posting_freqs = array('f')
+        posting_offsets = array('Q', [0])
+        for term in terms:
+            for post_id, freq in search.postings[term.decode()].items():
+                posting_docs.append(positions[post_id])
+                posting_freqs.append(freq)
+            posting_offsets.append(len(posting_docs))
+        related = array('I')
+        for post in posts:
+            ids = neighbours.get(post['id'], [])[:RelatedPostsIndex.TOP_K]
+            related.extend(positions[other_id] for other_id in ids)
+            related.extend([cls.NO_NEIGHBOUR] * (RelatedPostsIndex.TOP_K - len(ids)))
+
+        summary_blob, summary_offsets = cls._pack(summaries)
+        body_blob, body_offsets = cls._pack(bodies)
+        term_blob, term_offsets = cls._pack(terms)
+        sections = [
+            ('summaries', summary_blob), ('summaries_offsets', summary_offsets),
+            ('bodies', body_blob), ('bodies_offsets', body_offsets),
+            ('terms', term_blob), ('terms_offsets', term_offsets),
+            ('posting_offsets', posting_offsets),
+            ('posting_docs', posting_docs),
+            ('posting_freqs', posting_freqs),
+            ('doc_lengths', array('f', (search.doc_lengths[post['id']] for post in posts))),
+            ('related', related),
+        ]
+
+        # Section offsets are relative to the aligned end of the header
+        header = {'version': post_set_version(posts), 'schema': len(MIGRATIONS), 'count': len(posts),
+                  'avg_length': search.total_length / len(posts) if posts else 0.0, 'sections': {}}
+        offset = 0
+        for name, data in sections:
+            raw_length = len(data) * data.itemsize if isinstance(data, array) else len(data)
+            header['sections'][name] = [offset, raw_length, data.typecode if isinstance(data, array) else 'B']
+            offset = cls._align(offset + raw_length)
+        header_bytes = json.dumps(header, separators=(',', ':')).encode()
+        data_start = cls._align(len(cls.MAGIC) + 4 + len(header_bytes))
+
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.MAGIC + len(header_bytes).to_bytes(4, 'little') + header_bytes)
+            for name, data in sections:
+                f.write(b'\0' * (data_start + header['sections'][name][0] - f.tell()))
+                f.write(data.tobytes() if isinstance(data, array) else data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return header['version']
+
+    @staticmethod
+    def _pack(blobs):
+        offsets = array('Q', [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        return b''.join(blobs), offsets
+
+    @staticmethod
+    def _align(offset):
+        return (offset + 7) & ~7
+
+    def _blob(self, name, index):
+        offsets = self._sections[f'{name}_offsets']
+        return self._sections[name][offsets[index]:offsets[index + 1]]
+
+    def body(self, index):
+        return json.loads(bytes(self._blob('bodies', index)))
+
+    def _term(self, index):
+        return bytes(self._blob('terms', index))
+
+    def _expand(self, token):
+        # Same prefix expansion as SearchIndex._expand, bisecting the mapped term table
+        key = token.encode()
+        low, high = 0, len(self._sections['terms_offsets']) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        matches = []
+        for index in range(low, min(low + SearchIndex.MAX_PREFIX_TERMS, len(self._sections['terms_offsets']) - 1)):
+            term = self._term(index)
+            if not term.startswith(key):
+                break
+            matches.append((index, 1.0 if term == key else SearchIndex.PREFIX_WEIGHT))
+        return matches
+
+    def search(self, query):
+        """BM25 ranking over the mapped postings, matching SearchIndex.search."""
+        doc_count = len(self.posts)
+        if not doc_count:
+            return []
+        offsets = self._sections['posting_offsets']
+        docs = self._sections['posting_docs']
+        freqs = self._sections['posting_freqs']
+        lengths = self._sections['doc_lengths']
+        k1, b = SearchIndex.K1, SearchIndex.B
+        scores = Counter()
+        for token in set(tokenize(query)):
+            for term_index, weight in self._expand(token):
+                start, end = offsets[term_index], offsets[term_index + 1]
+                df = end - start
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for position in range(start, end):
+                    doc, freq = docs[position], freqs[position]
+                    norm = k1 * (1 - b + b * lengths[doc] / self.avg_length)
+                    scores[doc] += weight * idf * freq * (k1 + 1) / (freq + norm)
+        return [self.posts[doc] for doc, _ in scores.most_common()]
+
+    def related(self, post_id, limit=3):
+        index = self.positions.get(post_id)
+        if index is None:
+            return []
+        top_k = RelatedPostsIndex.TOP_K
+        row = self._sections['related'][index * top_k:index * top_k + min(limit, top_k)]
+        return [self.posts[other] for other in row if other != self.NO_NEIGHBOUR]
+
+class FeedSnapshotStore:
+    """Publishes and opens the shared snapshot file.
+
+    Writers replace the file with os.replace, so readers see either the old
+    or the new file. current() reopens it only when its inode or mtime changed,
+    which costs one stat per check.
+    """
+
+    def __init__(self, path=FEED_SNAPSHOT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stat_key = None
+        self.opens = 0
+        self.writes = 0
+
+    def current(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if key == self._stat_key:
+            return self._snapshot
+        with self._lock:
+            if key != self._stat_key:
+                snapshot = FeedSnapshot(self.path)
+                if snapshot.schema != len(MIGRATIONS):
+                    # Written before a migration rewrote stored posts; rebuild it
+                    snapshot = None
+                    self._snapshot = None
+                elif self._snapshot is None or snapshot.version != self._snapshot.version:
+                    self._snapshot = snapshot
+                    self.opens += 1
+                self._stat_key = key
+            return self._snapshot
+
+    def publish(self, posts, replace=True):
+        """Write posts unless the file already holds them.
+
+        With replace=False an existing snapshot is always kept. The check and
+        the write happen under a file lock, so such a write cannot land on
+        top of a newer snapshot another process has just published.
+        """
+        with open(f'{self.path}.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            snapshot = self.current()
+            if snapshot is None or (replace and snapshot.version != post_set_version(posts)):
+                FeedSnapshot.write(self.path, posts)
+                self.writes += 1
+            return self.current()
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version if snapshot else None,
+            'posts': len(snapshot.posts) if snapshot else 0,
+            'bytes': snapshot.size if snapshot else 0,
+            'opens': self.opens,
+            'writes': self.writes
+        }
+
+feed_snapshots = FeedSnapshotStore()
+
+def publish_feed_snapshot(posts, replace=True):
+    """Share freshly synced posts with every worker and return the mapped copy."""
+    if not posts or getattr(posts, 'snapshot', None) is not None:
+        # Already the shared snapshot; only a sync's own posts are published
+        return posts
+    try:
+        return feed_snapshots.publish(posts, replace).posts
+    except (OSError, ValueError) as e:
+        print(f"Feed snapshot error: {e}")
+        return posts
+
+
+POST_LOOKUP_MISS_TTL = int(os.environ.get('POST_LOOKUP_MISS_TTL', 600))
+POST_LOOKUP_MAX_FETCHED = int(os.environ.get('POST_LOOKUP_MAX_FETCHED', 256))
+POST_LOOKUP_MAX_MISSES = 10000
+POST_ID_RE = re.compile(r'(?:post-)?(\d+)')
+
+def fetch_single_post(post_id):
+    match = POST_ID_RE.fullmatch(post_id)
+    if not match:
+        return None
+    response = upstream_get(f"{BLOGGER_URL}/feeds/posts/default/{match.group(1)}?alt=json",
+                            session=request_http)
+    if response.status_code in (400, 404):
+        return None
+    response.raise_for_status()
+    entry = response.json().get('entry')
+    if not entry:
+        return None
+    fields = parse_blogger_entry(entry)
+    fields['id'] = post_id
+    with db.connection() as conn, conn:
+        store_thumbnail_sources(conn, [fields])
+    return Post(**fields)
+
+class PostLookup:
+    """O(1) post lookup by id.
+
+    Feed posts come from a dict rebuilt once per post set. Anything else is
+    fetched from Blogger once, kept in a bounded LRU, and ids Blogger does
+    not know are remembered for a while so repeated misses stay local.
+    """
+
+    def __init__(self, fetcher, max_fetched=POST_LOOKUP_MAX_FETCHED, miss_ttl=POST_LOOKUP_MISS_TTL):
+        self.fetcher = fetcher
+        self.max_fetched = max_fetched
+        self.miss_ttl = miss_ttl
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._source = None
+        self.by_id = {}
+        self.fetched = OrderedDict()
+        self.misses = OrderedDict()
+        self.hits = 0
+        self.fetched_hits = 0
+        self.negative_hits = 0
+        self.fetch_attempts = 0
+
+    def sync(self, posts):
+        if posts is self._source:
+            return
+        self.by_id = {post['id']: post for post in posts}
+        self._source = posts
+
+    def get(self, post_id):
+        post = self.by_id.get(post_id)
+        if post is not None:
+            self.hits += 1
+            return post
+
+        # Both caches are read without a lock, so a slow fetch of one id
+        # never holds up lookups of others.
+        post = self._fetched(post_id)
+        if post is not None or self.fetcher is None or self._missed(post_id):
+            return post
+
+        # Single flight per id: concurrent requests for the same unknown id
+        # wait for one upstream fetch instead of each making their own.
+        with self._lock:
+            flight = self._flights.setdefault(post_id, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                post = self._fetched(post_id)
+                if post is not None or self._missed(post_id):
+                    return post
+                return self._fetch(post_id)
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._flights[post_id]
+
+    def _fetched(self, post_id):
+        post = self.fetched.get(post_id)
+        if post is not None:
+            try:
+                self.fetched.move_to_end(post_id)
+            except KeyError:
+                pass
+            self.fetched_hits += 1
+        return post
+
+    def _missed(self, post_id):
+        expires = self.misses.get(post_id)
+        if expires is None:
+            return False
+        if expires > time.monotonic():
+            self.negative_hits += 1
+            return True
+        self.misses.pop(post_id, None)
+        return False
+
+    def _fetch(self, post_id):
+        self.fetch_attempts += 1
+        try:
+            post = self.fetcher(post_id)
+        except Exception:
+            self._remember_miss(post_id, FEED_CACHE_RETRY)
+            raise
+
+        if post is None:
+            self._remember_miss(post_id, self.miss_ttl)
+            return None
+        with self._lock:
+            self.fetched[post_id] = post
+            while len(self.fetched) > self.max_fetched:
+                self.fetched.popitem(last=False)
+        return post
+
+    def _remember_miss(self, post_id, ttl):
+        with self._lock:
+            self.misses[post_id] = time.monotonic() + ttl
+            self.misses.move_to_end(post_id)
+            while len(self.misses) > POST_LOOKUP_MAX_MISSES:
+                self.misses.popitem(last=False)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'fetched_hits': self.fetched_hits,
+            'negative_hits': self.negative_hits,
+            'fetch_attempts': self.fetch_attempts,
+            'indexed': len(self.by_id),
+            'fetched': len(self.fetched),
+            'misses': len(self.misses)
+        }
+
+# Outside request mode every post is in the stored snapshot, so unknown ids
+# are not looked up on Blogger from the request path.
+post_lookup = PostLookup(fetch_single_post if FEED_REFRESH_MODE == 'request' else None)
+feed_cache.listeners.append(post_lookup.sync)
+
+def get_post(post_id):
+    post_lookup.sync(get_blogger_posts())
+    return post_lookup.get(post_id)
+
+def get_fallback_posts(current_post_id, all_posts, limit=3):
+    return [post for post in all_posts if post['id'] != current_post_id][:limit]
+
+PAGE_CACHE_MAX_BYTES = int(os.environ.get('PAGE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+class CachedBody:
+    """A response body stored once, with precompressed variants."""
+
+    __slots__ = ('body', 'mimetype', 'etag', 'encodings', 'size')
+
+    def __init__(self, body, mimetype, compress=True, gzip_level=6, brotli_quality=5):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()[:20]
+        self.encodings = {}
+        if compress and len(body) > 512:
+            self.encodings['gzip'] = gzip.compress(body, compresslevel=gzip_level)
+            if brotli is not None:
+                self.encodings['br'] = brotli.compress(body, quality=brotli_quality)
+        self.size = len(body) + sum(len(data) for data in self.encodings.values())
 
-def safe_clean_html(html_content):
-    try:
-        if not html_content:
-            return ""
-        
-        html_content = html_content.replace('<br>', '\n').replace('<br/>', '\n').replace('<br />', '\n')
-
-        html_content = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL)
-        html_content = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL)
-        html_content = re.sub(r'<div[^>]*>', '<p>', html_content)
-        html_content = html_content.replace('</div>', '</p>')
-        html_content = re.sub(r'\s+', ' ', html_content)
-        html_content = unescape(html_content)
-        
-        return html_content.strip()
-    except Exception as e:
-        print(f"Error cleaning HTML: {e}")
-        return re.sub(r'<[^>]+>', ' ', html_content)[:500] + '...'
-    
-def get_related_posts(current_post_id, current_post_title, all_posts, limit=3):
-    related = []
+    def response(self):
+        # Pick the best stored encoding the client accepts; never compress here
+        encoding = None
+        for candidate in ('br', 'gzip'):
+            if candidate in self.encodings and request.accept_encodings[candidate]:
+                encoding = candidate
+                break
 
-    current_words = set(current_post_title.lower().split())
-    
-    for post in all_posts:
-        if post['id'] == current_post_id:
-            continue  
-        
+        response = Response(self.encodings[encoding] if encoding else self.body, mimetype=self.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+            response.set_etag(f'{self.etag}-{encoding}')
+        else:
+            response.set_etag(self.etag)
+        if self.encodings:
+            response.vary.add('Accept-Encoding')
+        return response.make_conditional(request)
 
-        post_words = set(post['title'].lower().split())
-        common_words = current_words.intersection(post_words)
-        
-        if len(common_words) >= 1:  
-            related.append({
-                'post': post,
-                'score': len(common_words)
-            })
+class PageCache:
+    """Response bodies keyed on feed version and URL, LRU-bounded by size.
 
-    related.sort(key=lambda x: x['score'], reverse=True)
-    return [item['post'] for item in related[:limit]]
+    The whole cache is dropped when the feed version changes, and renders
+    that started under an older version are not stored.
+    """
 
-def get_fallback_posts(current_post_id, all_posts, limit=3):
-    return [post for post in all_posts if post['id'] != current_post_id][:limit]
+    def __init__(self, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.version = None
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
 
+    def set_version(self, version):
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.size = 0
+                self.version = version
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, mimetype):
+        entry = CachedBody(body, mimetype)
+        if entry.size > self.max_bytes:
+            return entry
+        with self._lock:
+            if key[0] != self.version:
+                return entry
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old.size
+            self._entries[key] = entry
+            self.size += entry.size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+                self.evictions += 1
+        return entry
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'version': self.version
+        }
+
+page_cache = PageCache()
+feed_cache.listeners.append(lambda posts: page_cache.set_version(post_set_version(posts)))
+
+def cached_page(view):
+    """Serve a view from the page cache, precompressed, with ETag/304 support.
+
+    Only 200 responses are stored; a view can opt out for one request by
+    setting g.page_cacheable = False.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = get_feed_version()
+        page_cache.set_version(version)
+        key = (version, request.url)
+        entry = page_cache.get(key)
+        if entry is None:
+            g.page_cacheable = True
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or not g.page_cacheable:
+                return response
+            entry = page_cache.put(key, response.get_data(), response.mimetype)
+        return entry.response()
+    return wrapper
+
+warm_feed_cache()
 
 @app.route('/')
+@cached_page
 def home():
     posts = get_blogger_posts()
 
     featured = posts[0] if posts else None
- 
-    if featured and 'featured_content' not in featured:
-        featured['featured_content'] = featured.get('content', '')
-    
+
     seo_meta = generate_seo_meta(
         title="Tech Blog for Developers",
         description="Learn Linux, Python, AI, and web development with tutorials and guides."
@@ -246,79 +2220,119 @@ def home():
                          **seo_meta)
 
 @app.route('/blog')
+@cached_page
 def blog():
+    category = request.args.get('category')
+    if category:
+        # Old filter links; each category now has its own paginated page
+        key = category_key(category)
+        if category_index.name(get_blogger_posts(), key) is None:
+            abort(404)
+        return redirect(url_for('category', name=key), code=301)
+
     posts = get_blogger_posts()
-    all_categories = {}
-    for post in posts:
-        for cat in post.get('categories', []):
-            all_categories[cat] = all_categories.get(cat, 0) + 1
+    page = request.args.get('page', 1, type=int)
+    offset = (page - 1) * BLOG_PAGE_SIZE
+    if page < 1 or (page > 1 and offset >= len(posts)):
+        abort(404)
 
-    category = request.args.get('category', '').lower()
-    if category:
-        filtered_posts = [
-            p for p in posts 
-            if any(cat.lower() == category for cat in p.get('categories', []))
-        ]
-    else:
-        filtered_posts = posts
-    
     seo_meta = generate_seo_meta(
         title="Programming Tutorials & Guides",
         description="Browse all tech articles about Linux, Python, AI, and web development.",
         keywords="programming tutorials, coding guides, tech articles, developer resources"
     )
     
+    category_counts = category_index.counts(posts)
     return render_template('blog.html', 
-                         posts=filtered_posts,
-                         all_categories=sorted(all_categories.keys()),
-                         category_counts=all_categories,
+                         posts=posts[offset:offset + BLOG_PAGE_SIZE],
+                         total=len(posts),
+                         page=page,
+                         pages=math.ceil(len(posts) / BLOG_PAGE_SIZE),
+                         page_endpoint='blog',
+                         page_args={},
+                         all_categories=list(category_counts),
+                         category_counts=category_counts,
+                         **seo_meta)
+
+@app.route('/category/<path:name>')
+@cached_page
+def category(name):
+    posts = get_blogger_posts()
+    name = category_key(name)
+    display_name = category_index.name(posts, name)
+    if display_name is None:
+        abort(404)
+    page = request.args.get('page', 1, type=int)
+    if page < 1:
+        abort(404)
+    page_posts, total = category_index.page(posts, name, (page - 1) * BLOG_PAGE_SIZE, BLOG_PAGE_SIZE)
+    if not page_posts:
+        abort(404)
+
+    seo_meta = generate_seo_meta(
+        title=f"{display_name} Articles",
+        description=f"Tutorials, guides and articles about {display_name}.",
+        keywords=f"{display_name}, programming tutorials, tech articles"
+    )
+
+    category_counts = category_index.counts(posts)
+    return render_template('blog.html',
+                         posts=page_posts,
+                         total=total,
+                         current_category=name,
+                         category_name=display_name,
+                         page=page,
+                         pages=math.ceil(total / BLOG_PAGE_SIZE),
+                         page_endpoint='category',
+                         page_args={'name': name},
+                         all_categories=list(category_counts),
+                         category_counts=category_counts,
                          **seo_meta)
 
 @app.route('/post/<post_id>')
 def post_detail(post_id):
+    response = render_post_detail(post_id)
+    view_counter.increment(post_id)
+    return response
+
+@cached_page
+def render_post_detail(post_id):
     all_posts = get_blogger_posts()
-    post_data = next((p for p in all_posts if p['id'] == post_id), None)
-    
-    if not post_data:
-        try:
-            response = requests.get(f"{BLOGGER_URL}/feeds/posts/default/{post_id}?alt=json")
-            if response.status_code == 200:
-                data = response.json()
-                entry = data.get('entry', {})
-                post_data = {
-                    'id': post_id,
-                    'title': entry.get('title', {}).get('$t', 'Post'),
-                    'content': entry.get('content', {}).get('$t', 'Post not found'),
-                    'plain_content': clean_html_content(entry.get('content', {}).get('$t', '')),
-                    'url': f"{BLOGGER_URL}/{post_id}",
-                    'date': datetime.now().strftime('%B %d, %Y'),
-                    'thumbnail': extract_first_image(entry.get('content', {}).get('$t', '')) or 
-                                f"https://via.placeholder.com/400x200/4ade80/0f172a?text={entry.get('title', {}).get('$t', 'Post')}",
-                    'categories': extract_categories(entry)
-                }
-        except:
-            post_data = {
-                'id': post_id,
-                'title': 'Post Not Found',
-                'content': 'The requested post could not be loaded.',
-                'plain_content': 'The requested post could not be loaded.',
-                'url': '#',
-                'date': datetime.now().strftime('%B %d, %Y'),
-                'thumbnail': f"https://via.placeholder.com/400x200/f59e0b/0f172a?text=Post+Not+Found",
-                'categories': ['Tech']
-            }
+    try:
+        post_data = get_post(post_id)
+    except Exception as e:
+        print(f"Error loading post {post_id}: {e}")
+        g.page_cacheable = False
+        post_data = Post(
+            id=post_id,
+            title='Post Not Found',
+            content='The requested post could not be loaded.',
+            plain_content='The requested post could not be loaded.',
+            url='#',
+            date=datetime.now().strftime('%B %d, %Y'),
+            thumbnail=placeholder_thumbnail('Post Not Found'),
+            categories=['Tech']
+        )
+
+    if post_data is None:
+        abort(404)
 
-    related_posts = get_related_posts(post_id, post_data['title'], all_posts, 3)
+    related_posts = get_related_posts(post_id, all_posts, 3)
 
     if not related_posts:
         related_posts = get_fallback_posts(post_id, all_posts, 3)
 
+    # Social cards need an absolute URL to the large crop
+    share_image = post_data.get('thumbnail', '')
+    if share_image:
+        share_image = urljoin(request.host_url, thumbnail_size_filter(share_image, 'hero'))
+
     structured_data = {
         "@context": "https://schema.org",
         "@type": "BlogPosting",
         "headline": str(post_data['title']),
-        "description": clean_html_content(post_data.get('content', ''))[:200] if post_data.get('content') else "",
-        "image": post_data.get('thumbnail', ''),
+        "description": post_data.get('plain_content', '')[:200],
+        "image": share_image,
         "datePublished": post_data['date'],
         "dateModified": post_data['date'],
         "author": {
@@ -333,16 +2347,10 @@ def post_detail(post_id):
 
     structured_data_json = json.dumps(structured_data, default=str)
 
-    conn = sqlite3.connect('blog.db')
-    c = conn.cursor()
-    c.execute('UPDATE analytics SET page_views = page_views + 1 WHERE id = 1')
-    conn.commit()
-    conn.close()
-    
     seo_meta = generate_seo_meta(
         title=post_data['title'],
-        description=clean_html_content(post_data.get('content', ''))[:160] if post_data.get('content') else "",
-        image=post_data.get('thumbnail', '')
+        description=post_data.get('meta_description') or post_data.get('plain_content', '')[:META_DESCRIPTION_LENGTH],
+        image=share_image
     )
     
     return render_template('post.html', 
@@ -356,29 +2364,25 @@ def search():
     try:
         query = request.args.get('q', '').strip().lower()
         sort_by = request.args.get('sort', 'relevance')
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = 12
         
         # Get posts with error handling
         try:
-            all_posts = get_blogger_posts()
+            results = search_posts(query) if query else list(get_blogger_posts())
         except Exception as e:
             print(f"Error getting posts: {e}")
-            all_posts = []
-        
-        results = []
-        
-        if query and all_posts:
-            # Simple search
-            for post in all_posts:
-                if query in post['title'].lower() or query in post.get('preview', '').lower():
-                    results.append(post)
-        else:
-            results = all_posts
+            results = []
         
-        # Sort results
+        # Sort results; 'relevance' keeps the BM25 order from the index
         if sort_by == 'recent':
-            results.sort(key=lambda x: x.get('date', ''), reverse=True)
+            results.sort(key=lambda x: x.get('published', ''), reverse=True)
         elif sort_by == 'title':
             results.sort(key=lambda x: x['title'].lower())
+
+        total_pages = max(math.ceil(len(results) / per_page), 1)
+        page = min(page, total_pages)
+        start = (page - 1) * per_page
         
         seo_meta = generate_seo_meta(
             title=f"Search Results: '{query}'" if query else "Search Articles",
@@ -387,11 +2391,11 @@ def search():
         )
         
         return render_template('search_results.html',
-                             results=results[:12],
+                             results=results[start:start + per_page],
                              search_query=query,
                              sort=sort_by,
-                             page=1,
-                             total_pages=1,
+                             page=page,
+                             total_pages=total_pages,
                              total_results=len(results),
                              categories=[],
                              **seo_meta)
@@ -404,6 +2408,242 @@ def search():
                              search_query=request.args.get('q', ''),
                              error="Search temporarily unavailable")
 
+SMTP_HOST = os.environ.get('SMTP_HOST')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', 587))
+SMTP_USERNAME = os.environ.get('SMTP_USERNAME')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+# 'starttls', 'ssl' or 'none'; the default follows the usual port conventions
+SMTP_SECURITY = os.environ.get('SMTP_SECURITY', {587: 'starttls', 465: 'ssl'}.get(SMTP_PORT, 'none'))
+SMTP_TIMEOUT = float(os.environ.get('SMTP_TIMEOUT', 10))
+MAIL_FROM = os.environ.get('MAIL_FROM', SMTP_USERNAME or 'noreply@localhost')
+CONTACT_NOTIFY_TO = os.environ.get('CONTACT_NOTIFY_TO')
+MAIL_BATCH_SIZE = int(os.environ.get('MAIL_BATCH_SIZE', 20))
+MAIL_POLL_INTERVAL = float(os.environ.get('MAIL_POLL_INTERVAL', 30))
+MAIL_MAX_ATTEMPTS = int(os.environ.get('MAIL_MAX_ATTEMPTS', 8))
+MAIL_MAX_BACKOFF = float(os.environ.get('MAIL_MAX_BACKOFF', 3600))
+MAIL_LEASE = 300
+SMTP_IDLE_TIMEOUT = 60
+
+def enqueue_contact_mail(conn, contact_id, name, email, message):
+    # Collapse whitespace so form input cannot add header lines
+    name = ' '.join(name.split())
+    conn.execute('''
+        INSERT INTO mail_outbox (contact_id, recipient, reply_to, subject, body)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (contact_id, CONTACT_NOTIFY_TO, ''.join(email.split()),
+          f'New contact message from {name}',
+          f'Name: {name}\nEmail: {email}\n\n{message}\n'))
+
+class MailSender:
+    """Background delivery of mail_outbox rows over one reused SMTP connection.
+
+    Requests only insert outbox rows and wake the sender. It claims due rows
+    in batches under a lease, so each worker can run a sender without two of
+    them sending the same message, and keeps its SMTP connection open between
+    batches until it has been idle for a while. Failed messages are retried
+    with exponential backoff and marked failed after max_attempts, or at once
+    when the server rejects them permanently.
+    """
+
+    BASE_BACKOFF = 30
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, security=SMTP_SECURITY,
+                 batch_size=MAIL_BATCH_SIZE, poll_interval=MAIL_POLL_INTERVAL,
+                 max_attempts=MAIL_MAX_ATTEMPTS, max_backoff=MAIL_MAX_BACKOFF):
+        self.host = host
+        self.port = port
+        self.security = security
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+        self._smtp = None
+        self._last_used = 0.0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+        self.connections = 0
+
+    @property
+    def enabled(self):
+        return bool(self.host and CONTACT_NOTIFY_TO)
+
+    def start(self):
+        # Started per process on first use, so a forked worker gets its own thread
+        if not self.enabled or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._smtp = None
+            threading.Thread(target=self._run, name='mail-sender', daemon=True).start()
+
+    def wake(self):
+        self.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            try:
+                claimed = self.run_once()
+            except Exception as e:
+                print(f"Mail sender error: {e}")
+                claimed = 0
+            if claimed == self.batch_size:
+                continue
+            if self._smtp is not None and time.monotonic() - self._last_used > SMTP_IDLE_TIMEOUT:
+                self.close()
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def run_once(self):
+        """Deliver one batch of due messages and return how many were claimed."""
+        batch = self._claim()
+        if not batch:
+            return 0
+        results = []
+        for row in batch:
+            try:
+                self._send(row)
+                results.append((row, None))
+            except Exception as e:
+                results.append((row, e))
+        self._record(results)
+        self.batches += 1
+        return len(batch)
+
+    def _claim(self):
+        now = time.time()
+        with db.connection() as conn, conn:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute('''
+                SELECT id, recipient, reply_to, subject, body, attempts FROM mail_outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY id LIMIT ?
+            ''', (now, self.batch_size)).fetchall()
+            # Leased until it is recorded, in case this worker dies mid-batch
+            conn.executemany('UPDATE mail_outbox SET next_attempt_at = ? WHERE id = ?',
+                             [(now + MAIL_LEASE, row[0]) for row in rows])
+        return rows
+
+    def _send(self, row):
+        _, recipient, reply_to, subject, body, _ = row
+        message = MIMEText(body, 'plain', 'utf-8')
+        message['Subject'] = subject
+        message['From'] = MAIL_FROM
+        message['To'] = recipient
+        if reply_to:
+            message['Reply-To'] = reply_to
+        message['Date'] = formatdate(localtime=True)
+        message['Message-ID'] = make_msgid()
+        reused = self._smtp is not None
+        try:
+            self._connection().send_message(message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            self.close()
+            if not reused:
+                raise
+            # The kept-open connection was dropped by the server; reconnect once
+            self._connection().send_message(message)
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # The server answered, so the connection is still usable
+            raise
+        except Exception:
+            self.close()
+            raise
+        self._last_used = time.monotonic()
+
+    def _connection(self):
+        if self._smtp is not None:
+            return self._smtp
+        if self.security == 'ssl':
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=SMTP_TIMEOUT)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+            if self.security == 'starttls':
+                smtp.starttls()
+        if SMTP_USERNAME:
+            smtp.login(SMTP_USERNAME, SMTP_PASSWORD or '')
+        self.connections += 1
+        self._smtp = smtp
+        return smtp
+
+    def _record(self, results):
+        now = time.time()
+        sent, retry, failed = [], [], []
+        for row, error in results:
+            message_id, attempts = row[0], row[5] + 1
+            if error is None:
+                sent.append((message_id,))
+                continue
+            print(f"Mail {message_id} attempt {attempts} failed: {error}")
+            permanent = isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+            if permanent or isinstance(error, smtplib.SMTPRecipientsRefused) or attempts >= self.max_attempts:
+                failed.append((attempts, str(error), message_id))
+            else:
+                delay = min(self.max_backoff, self.BASE_BACKOFF * 2 ** (attempts - 1))
+                retry.append((attempts, str(error), now + delay * random.uniform(0.8, 1.2), message_id))
+        with db.connection() as conn, conn:
+            conn.executemany('''
+                UPDATE mail_outbox SET status = 'sent', attempts = attempts + 1, last_error = NULL,
+                    sent_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', sent)
+            conn.executemany('''
+                UPDATE mail_outbox SET attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?
+            ''', retry)
+            conn.executemany('''
+                UPDATE mail_outbox SET status = 'failed', attempts = ?, last_error = ? WHERE id = ?
+            ''', failed)
+        self.sent += len(sent)
+        self.retried += len(retry)
+        self.failed += len(failed)
+
+    def close(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'running': self._pid == os.getpid(),
+            'connected': self._smtp is not None,
+            'sent': self.sent,
+            'retried': self.retried,
+            'failed': self.failed,
+            'batches': self.batches,
+            'connections': self.connections
+        }
+
+mail_sender = MailSender()
+atexit.register(mail_sender.close)
+
+@app.before_request
+def start_mail_sender():
+    # Picks up messages left in the outbox by an earlier process
+    mail_sender.start()
+
+@app.cli.command('send-mail')
+def send_mail_command():
+    """Deliver every due message in the mail outbox once."""
+    if not mail_sender.enabled:
+        raise SystemExit("Set SMTP_HOST and CONTACT_NOTIFY_TO to send mail")
+    try:
+        while mail_sender.run_once() == mail_sender.batch_size:
+            pass
+    finally:
+        mail_sender.close()
+    print(f"Sent {mail_sender.sent}, retrying {mail_sender.retried}, failed {mail_sender.failed}")
+
 @app.route('/contact', methods=['GET', 'POST'])
 def contact():
     message_sent = False
@@ -419,21 +2659,13 @@ def contact():
             flash('Please enter a valid email address!', 'error')
         else:
             try:
-                conn = sqlite3.connect('blog.db')
-                c = conn.cursor()
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS contacts (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        email TEXT NOT NULL,
-                        message TEXT NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                c.execute('INSERT INTO contacts (name, email, message) VALUES (?, ?, ?)',
-                         (name, email, message))
-                conn.commit()
-                conn.close()
+                # Only local writes here; the notification is sent in the background
+                with db.connection() as conn, conn:
+                    cursor = conn.execute('INSERT INTO contacts (name, email, message) VALUES (?, ?, ?)',
+                                          (name, email, message))
+                    if mail_sender.enabled:
+                        enqueue_contact_mail(conn, cursor.lastrowid, name, email, message)
+                mail_sender.wake()
                 
                 flash('Message sent successfully! We\'ll get back to you soon.', 'success')
                 message_sent = True
@@ -453,39 +2685,579 @@ def contact():
                          **seo_meta)
 
 
+def requested_fields():
+    # The full post by default; ?fields= narrows it, e.g. to skip the bodies
+    fields = request.args.get('fields')
+    if not fields:
+        return tuple(POST_COLUMNS)
+    fields = tuple(sorted({field.strip() for field in fields.split(',') if field.strip()}))
+    unknown = set(fields) - set(POST_COLUMNS)
+    if unknown:
+        abort(400, description=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+def posts_json_response(cache_key, load_posts):
+    # Serialise each (feed version, endpoint, fields, page) once and serve the
+    # stored identity/gzip/brotli bytes on later requests.
+    fields = requested_fields()
+    version = get_feed_version()
+    page_cache.set_version(version)
+    key = (version, 'api', cache_key, fields)
+    entry = page_cache.get(key)
+    if entry is None:
+        posts = load_posts()
+        if not set(fields).isdisjoint(Post.BODY_FIELDS):
+            # One body read per post rather than one per body field
+            posts = [post.loaded() for post in posts]
+        posts = [{field: post.get(field) for field in fields} for post in posts]
+        body = json.dumps({'success': True, 'posts': posts}, separators=(',', ':')).encode()
+        entry = page_cache.put(key, body, 'application/json')
+    return entry.response()
+
 @app.route('/api/all-posts')
 def api_all_posts():
-    posts = get_blogger_posts()
-    return jsonify({'success': True, 'posts': posts})
+    return posts_json_response('all', get_blogger_posts)
 
 @app.route('/api/paginated-posts')
 def api_paginated_posts():
     page = request.args.get('page', 1, type=int)
-    posts = get_paginated_posts(page, 6)
-    return jsonify({'success': True, 'posts': posts})
+    return posts_json_response(('page', page), lambda: get_paginated_posts(page, 6))
+
+VIEW_FLUSH_INTERVAL = float(os.environ.get('VIEW_FLUSH_INTERVAL', 5.0))
+
+class ViewCounter:
+    """In-memory page-view counters, flushed to SQLite as aggregated deltas.
+
+    Each thread is given one of a few lock-protected shards round-robin on
+    its first increment, so request threads rarely contend. A background thread swaps the shards
+    out every flush interval and applies the summed deltas in one
+    transaction. Reads add this worker's pending deltas to the stored value.
+    """
+
+    SITE = None
+    SHARDS = 8
+
+    def __init__(self, flush_interval=VIEW_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._shards = [(threading.Lock(), Counter()) for _ in range(self.SHARDS)]
+        self._next_shard = count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.flushes = 0
+        self.errors = 0
+
+    def increment(self, post_id=SITE):
+        # A post view also counts towards the site-wide total
+        self._ensure_started()
+        lock, counts = self._shard()
+        with lock:
+            counts[self.SITE] += 1
+            if post_id is not self.SITE:
+                counts[post_id] += 1
+
+    def _shard(self):
+        # Not threading.get_ident() % SHARDS: idents are aligned stack
+        # addresses, so that put every thread on the same shard.
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = self._shards[next(self._next_shard) % self.SHARDS]
+        return shard
+
+    def pending(self, key=SITE):
+        total = 0
+        for lock, counts in self._shards:
+            with lock:
+                total += counts.get(key, 0)
+        return total
+
+    def page_views(self):
+        with db.connection() as conn:
+            row = conn.execute('SELECT page_views FROM analytics WHERE id = 1').fetchone()
+        return (row[0] if row else 0) + self.pending()
+
+    def post_views(self, post_id):
+        with db.connection() as conn:
+            row = conn.execute('SELECT views FROM post_views WHERE post_id = ?', (post_id,)).fetchone()
+        return (row[0] if row else 0) + self.pending(post_id)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def _drain(self):
+        deltas = Counter()
+        for lock, counts in self._shards:
+            with lock:
+                deltas.update(counts)
+                counts.clear()
+        return deltas
+
+    def flush(self):
+        deltas = self._drain()
+        if not deltas:
+            return
+        site_views = deltas.pop(self.SITE, 0)
+        try:
+            with db.connection() as conn, conn:
+                if site_views:
+                    conn.execute('UPDATE analytics SET page_views = page_views + ? WHERE id = 1', (site_views,))
+                conn.executemany('''
+                    INSERT INTO post_views (post_id, views) VALUES (?, ?)
+                    ON CONFLICT(post_id) DO UPDATE SET views = views + excluded.views
+                ''', deltas.items())
+            self.flushes += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"View counter flush error: {e}")
+            # Put the deltas back so they are retried on the next flush
+            lock, counts = self._shards[0]
+            with lock:
+                counts[self.SITE] += site_views
+                counts.update(deltas)
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+    def stats(self):
+        return {
+            'pending_site_views': self.pending(),
+            'flushes': self.flushes,
+            'errors': self.errors
+        }
+
+view_counter = ViewCounter()
+atexit.register(view_counter.close)
 
 @app.route('/api/analytics')
 def api_analytics():
-    conn = sqlite3.connect('blog.db')
-    c = conn.cursor()
-    c.execute('SELECT page_views FROM analytics WHERE id = 1')
-    views = c.fetchone()[0]
-    conn.close()
-    
-    return jsonify({'views': views})
+    post_id = request.args.get('post_id')
+    if post_id:
+        return jsonify({'post_id': post_id, 'views': view_counter.post_views(post_id)})
+    return jsonify({'views': view_counter.page_views()})
+
+def cache_stats():
+    return {
+        'feed': feed_cache.stats(),
+        'posts': post_lookup.stats(),
+        'analytics_queue': analytics_writer.stats(),
+        'view_counter': view_counter.stats(),
+        'pages': page_cache.stats(),
+        'refresher': feed_refresher.stats(),
+        'snapshot': feed_snapshots.stats(),
+        'thumbnails': thumbnail_cache.stats(),
+        'assets': assets.stats(),
+        'mail': mail_sender.stats()
+    }
+
+@app.route('/api/cache-stats')
+def api_cache_stats():
+    return jsonify(cache_stats())
+
+@app.route('/metrics')
+def prometheus_metrics():
+    gauges = [
+        ('paradise_cache_stat', (('cache', cache), ('stat', stat)), int(value) if isinstance(value, bool) else value)
+        for cache, stats in cache_stats().items()
+        for stat, value in stats.items()
+        if isinstance(value, (int, float))
+    ]
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
 
 @app.route('/api/track-view', methods=['POST'])
 def api_track_view():
     try:
-        conn = sqlite3.connect('blog.db')
-        c = conn.cursor()
-        c.execute('UPDATE analytics SET page_views = page_views + 1 WHERE id = 1')
-        conn.commit()
-        conn.close()
+        view_counter.increment()
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+THUMBNAIL_DIR = os.environ.get('THUMBNAIL_DIR', os.path.join(app.static_folder, 'thumbnails'))
+THUMBNAIL_CACHE_MAX_BYTES = int(os.environ.get('THUMBNAIL_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+THUMBNAIL_MAX_SOURCE_BYTES = 10 * 1024 * 1024
+THUMBNAIL_FAILURE_TTL = int(os.environ.get('THUMBNAIL_FAILURE_TTL', 600))
+THUMBNAIL_KEY_RE = re.compile(r'[0-9a-f]{24}')
+BLOGGER_IMAGE_HOSTS = ('blogger.googleusercontent.com', 'bp.blogspot.com', 'googleusercontent.com')
+BLOGGER_SIZE_SEGMENT_RE = re.compile(r'/(?:s\d+|w\d+-h\d+)(?:-[a-z0-9-]+)?/(?=[^/]+$)')
+BLOGGER_SIZE_SUFFIX_RE = re.compile(r'=(?:s\d+|w\d+-h\d+)(?:-[a-z0-9-]+)?$')
+
+PLACEHOLDER_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" width="400" height="200" viewBox="0 0 400 200">'
+    '<rect width="400" height="200" fill="#{color}"/>'
+    '<text x="200" y="100" fill="#0f172a" font-family="system-ui, sans-serif" font-size="28" '
+    'font-weight="600" text-anchor="middle" dominant-baseline="middle">{label}</text></svg>'
+)
+
+def sized_image_url(source, width, height):
+    # Blogger resizes and crops on its side when the size token is rewritten
+    host = urlparse(source).hostname or ''
+    if not host.endswith(BLOGGER_IMAGE_HOSTS):
+        return None
+    token = f'w{width}-h{height}-c'
+    if BLOGGER_SIZE_SEGMENT_RE.search(source):
+        return BLOGGER_SIZE_SEGMENT_RE.sub(f'/{token}/', source, count=1)
+    if BLOGGER_SIZE_SUFFIX_RE.search(source):
+        return BLOGGER_SIZE_SUFFIX_RE.sub(f'={token}', source, count=1)
+    return source + f'={token}'
+
+def download_image(url):
+    response = http.get(url, timeout=BLOGGER_TIMEOUT, stream=True)
+    try:
+        response.raise_for_status()
+        if not response.headers.get('Content-Type', '').startswith('image/'):
+            raise ValueError(f"{url} is not an image")
+        data = response.raw.read(THUMBNAIL_MAX_SOURCE_BYTES + 1, decode_content=True)
+        if len(data) > THUMBNAIL_MAX_SOURCE_BYTES:
+            raise ValueError(f"{url} is larger than {THUMBNAIL_MAX_SOURCE_BYTES} bytes")
+        return data
+    finally:
+        response.close()
+
+def render_thumbnail(source, size):
+    width, height = THUMBNAIL_SIZES[size]
+    sized = sized_image_url(source, width, height)
+    if sized:
+        return download_image(sized)
+    data = download_image(source)
+    if Image is None:
+        # Without Pillow other hosts are cached at their original size
+        return data
+    with Image.open(BytesIO(data)) as image:
+        image_format = image.format or 'JPEG'
+        fitted = ImageOps.fit(image, (width, height))
+        if image_format == 'JPEG' and fitted.mode not in ('RGB', 'L'):
+            fitted = fitted.convert('RGB')
+        output = BytesIO()
+        fitted.save(output, format=image_format, quality=82, optimize=True)
+        return output.getvalue()
+
+class ThumbnailCache:
+    """Bounded on-disk cache of resized thumbnails under static/thumbnails.
+
+    Files are named by the hash of their source URL, so a name always maps
+    to the same image and can be cached forever by browsers. Reads bump the
+    file's mtime and, once the directory grows past max_bytes, the least
+    recently used files are deleted.
+
+    Images are only downloaded by a background filler thread. After each feed
+    refresh it fills the card thumbnail of every post that lacks one, and a
+    request for a thumbnail that is not on disk yet queues it ahead of that.
+    A source that fails is not retried for failure_ttl seconds.
+    """
+
+    def __init__(self, root=THUMBNAIL_DIR, max_bytes=THUMBNAIL_CACHE_MAX_BYTES,
+                 failure_ttl=THUMBNAIL_FAILURE_TTL):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.failure_ttl = failure_ttl
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._queued = set()
+        self._failed = {}
+        self._posts = None
+        self._pid = None
+        self._size = None
+        self.hits = 0
+        self.fills = 0
+        self.errors = 0
+        self.evictions = 0
+
+    def path(self, size, name):
+        return os.path.join(self.root, size, name)
+
+    def get(self, size, name):
+        path = self.path(size, name)
+        if not os.path.exists(path):
+            return None
+        self._touch(path)
+        return path
+
+    def request(self, size, name, key):
+        """Queue a missing thumbnail for the filler unless its source is failing."""
+        if self.failing(key):
+            return
+        with self._lock:
+            if (size, name) in self._queued:
+                return
+            self._queued.add((size, name))
+        self._queue.put((size, name, key))
+
+    def failing(self, key):
+        expires = self._failed.get(key)
+        return expires is not None and expires > time.monotonic()
+
+    def prefetch(self, posts):
+        # Feed listener: the filler walks the newest post set when it is next idle
+        self._posts = posts
+        self._queue.put(None)
+
+    def start(self):
+        # Started per process on first use, so a forked worker gets its own thread
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name='thumbnail-filler', daemon=True).start()
+
+    def _run(self):
+        if self._posts is None:
+            try:
+                self._posts = get_blogger_posts()
+            except Exception as e:
+                print(f"Thumbnail prefetch skipped: {e}")
+        backlog = iter(())
+        while True:
+            posts, self._posts = self._posts, None
+            if posts is not None:
+                backlog = self._missing(posts)
+            # Requested thumbnails go before the prefetch backlog
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                item = next(backlog, None) or self._queue.get()
+            if item is not None:
+                self._fill(*item)
+
+    def _missing(self, posts):
+        for post in posts:
+            url = post.get('thumbnail') or ''
+            if not url.startswith('/static/thumbnails/card/'):
+                continue
+            name = url.rsplit('/', 1)[1]
+            key = os.path.splitext(name)[0]
+            if not os.path.exists(self.path('card', name)) and not self.failing(key):
+                yield 'card', name, key
+
+    def _fill(self, size, name, key):
+        try:
+            path = self.path(size, name)
+            if os.path.exists(path) or self.failing(key):
+                return
+            source = thumbnail_source(key)
+            if source is None:
+                return
+            self._store(path, render_thumbnail(source, size))
+            self.fills += 1
+        except Exception as e:
+            print(f"Thumbnail error for {key}: {e}")
+            self.errors += 1
+            self._failed[key] = time.monotonic() + self.failure_ttl
+        finally:
+            with self._lock:
+                self._queued.discard((size, name))
+
+    def _touch(self, path):
+        self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _store(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._files())
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _files(self):
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def _evict(self):
+        # Rescan so files written by other workers are counted too
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._size = total
+
+    def stats(self):
+        return {
+            'bytes': self._size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'fills': self.fills,
+            'errors': self.errors,
+            'evictions': self.evictions,
+            'queued': len(self._queued),
+            'failing': sum(1 for expires in list(self._failed.values()) if expires > time.monotonic())
+        }
+
+thumbnail_cache = ThumbnailCache()
+feed_cache.listeners.append(thumbnail_cache.prefetch)
+
+@app.before_request
+def start_thumbnail_filler():
+    thumbnail_cache.start()
+
+def thumbnail_source(key):
+    with db.connection() as conn:
+        row = conn.execute('SELECT source FROM thumbnail_sources WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else None
+
+def immutable(response):
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/static/thumbnails/placeholder/<color>/<path:label>.svg')
+def placeholder_image(color, label):
+    if color not in PLACEHOLDER_COLORS:
+        abort(404)
+    svg = PLACEHOLDER_SVG.format(color=color, label=escape(label[:15]))
+    return immutable(Response(svg, mimetype='image/svg+xml'))
+
+@app.route('/static/thumbnails/<size>/<name>')
+def thumbnail(size, name):
+    key, extension = os.path.splitext(name)
+    if size not in THUMBNAIL_SIZES or extension not in THUMBNAIL_EXTENSIONS or not THUMBNAIL_KEY_RE.fullmatch(key):
+        abort(404)
+    path = thumbnail_cache.get(size, name)
+    if path is None:
+        source = thumbnail_source(key)
+        if source is None:
+            abort(404)
+        # Never download on the request thread: the browser gets the original
+        # until the filler has stored the thumbnail.
+        thumbnail_cache.request(size, name, key)
+        return redirect(source)
+    return immutable(send_file(path, mimetype=THUMBNAIL_EXTENSIONS[extension], max_age=31536000))
+
+@app.template_filter('category_key')
+def category_key_filter(name):
+    return category_key(name)
+
+@app.template_filter('thumbnail_size')
+def thumbnail_size_filter(url, size):
+    # Cached thumbnails exist per size; other URLs are passed through
+    if url and url.startswith('/static/thumbnails/card/') and size in THUMBNAIL_SIZES:
+        return url.replace('/card/', f'/{size}/', 1)
+    return url
+
+# Built at startup whether or not a template links them yet; a file that is
+# missing keeps its plain /static URL.
+ASSET_FILES = ['css/styles.css', 'js/script.js', 'js/analytics.js']
+ASSET_MIMETYPES = {'.css': 'text/css', '.js': 'text/javascript'}
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,])\s*')
+
+def minify_css(source):
+    source = CSS_COMMENT_RE.sub('', source)
+    source = re.sub(r'\s+', ' ', source)
+    source = CSS_PUNCTUATION_RE.sub(r'\1', source)
+    return source.replace(';}', '}').strip()
+
+def minify_js(source):
+    # Only whole-line comments and indentation are dropped; anything that
+    # needs a tokenizer to remove safely is left alone.
+    lines = []
+    for line in source.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+ASSET_MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+class AssetManifest:
+    """Fingerprinted, minified and precompressed copies of the site's CSS/JS.
+
+    Built once at startup. Each file is served as name.<hash>.ext from
+    /static/dist, so its URL changes whenever its content does and browsers
+    may cache it for a year.
+    """
+
+    def __init__(self, static_folder, files=ASSET_FILES):
+        self.static_folder = static_folder
+        self.files = files
+        self.urls = {}
+        self.bodies = {}
+
+    def build(self):
+        urls, bodies = {}, {}
+        for filename in self.files:
+            path = os.path.join(self.static_folder, filename)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    source = f.read()
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                print(f"Asset {filename} skipped: {e}")
+                continue
+            stem, extension = os.path.splitext(filename)
+            body = ASSET_MINIFIERS[extension](source).encode()
+            fingerprint = hashlib.sha1(body).hexdigest()[:12]
+            name = f'{stem}.{fingerprint}{extension}'
+            urls[filename] = name
+            bodies[name] = CachedBody(body, ASSET_MIMETYPES[extension], gzip_level=9, brotli_quality=11)
+        self.urls, self.bodies = urls, bodies
+        return self
+
+    def get(self, name):
+        return self.bodies.get(name)
+
+    def stats(self):
+        return {
+            'files': dict(self.urls),
+            'bytes': sum(body.size for body in self.bodies.values())
+        }
+
+assets = AssetManifest(app.static_folder).build()
+
+@app.route('/static/dist/<path:filename>')
+def asset(filename):
+    body = assets.get(filename)
+    if body is None:
+        abort(404)
+    return immutable(body.response())
+
+@app.template_global()
+def asset_url(endpoint, **values):
+    """url_for() that points built static files at their fingerprinted copy."""
+    if endpoint == 'static' and values.get('filename') in assets.urls:
+        values['filename'] = assets.urls[values['filename']]
+        endpoint = 'asset'
+    return url_for(endpoint, **values)
+
 @app.errorhandler(404)
 def not_found(e):
     return render_template('404.html'), 404
@@ -511,85 +3283,324 @@ def track_ad_click():
     print(f"Ad clicked: {data.get('ad_id')}")
     return jsonify({'success': True})
 
+def analytics_row(data):
+    event_type = data.get('event')
+    post_id = data.get('post_id')
+    post_title = data.get('post_title')
+    return (
+        str(event_type)[:64] if event_type is not None else None,
+        json.dumps(data),
+        request.referrer,
+        request.user_agent.string,
+        request.remote_addr,
+        str(post_id) if post_id is not None else None,
+        str(post_title)[:300] if post_title is not None else None,
+        datetime.now(pytz.utc).strftime('%Y-%m-%d %H:%M:%S')
+    )
+
+def update_analytics_rollups(conn, rows):
+    # Fold a batch of analytics_events rows into the hourly/daily rollups
+    # inside the writer's transaction, so the dashboard never scans events.
+    hourly = Counter()
+    daily = {}
+    visitors = {}
+    post_views = Counter()
+    post_titles = {}
+    for event_type, _, _, _, ip_address, post_id, post_title, created_at in rows:
+        day = created_at[:10]
+        hourly[(created_at[:13] + ':00', event_type or '')] += 1
+        totals = daily.setdefault(day, Counter())
+        totals['total_visits'] += 1
+        totals['page_views'] += event_type == 'page_view'
+        totals['post_views'] += event_type == 'view_post'
+        if ip_address:
+            visitors.setdefault(day, set()).add(ip_address)
+        if event_type == 'view_post' and post_id:
+            post_views[(day, post_id)] += 1
+            if post_title:
+                post_titles[post_id] = post_title
+
+    conn.executemany('''
+        INSERT INTO analytics_hourly (hour, event_type, events) VALUES (?, ?, ?)
+        ON CONFLICT(hour, event_type) DO UPDATE SET events = events + excluded.events
+    ''', [(hour, event_type, events) for (hour, event_type), events in hourly.items()])
+
+    for day, totals in daily.items():
+        before = conn.total_changes
+        conn.executemany('INSERT OR IGNORE INTO analytics_daily_visitors (day, ip_address) VALUES (?, ?)',
+                         [(day, ip_address) for ip_address in visitors.get(day, ())])
+        new_visitors = conn.total_changes - before
+        conn.execute('''
+            INSERT INTO analytics_daily (day, total_visits, unique_visitors, page_views, post_views)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(day) DO UPDATE SET
+                total_visits = total_visits + excluded.total_visits,
+                unique_visitors = unique_visitors + excluded.unique_visitors,
+                page_views = page_views + excluded.page_views,
+                post_views = post_views + excluded.post_views
+        ''', (day, totals['total_visits'], new_visitors, totals['page_views'], totals['post_views']))
+
+    conn.executemany('''
+        INSERT INTO post_views_daily (day, post_id, post_title, views) VALUES (?, ?, ?, ?)
+        ON CONFLICT(day, post_id) DO UPDATE SET
+            views = views + excluded.views,
+            post_title = COALESCE(excluded.post_title, post_title)
+    ''', [(day, post_id, post_titles.get(post_id), views) for (day, post_id), views in post_views.items()])
+
+    totals = Counter()
+    for (_, post_id), views in post_views.items():
+        totals[post_id] += views
+    conn.executemany('''
+        INSERT INTO post_view_totals (post_id, post_title, views) VALUES (?, ?, ?)
+        ON CONFLICT(post_id) DO UPDATE SET
+            views = views + excluded.views,
+            post_title = COALESCE(excluded.post_title, post_title)
+    ''', [(post_id, post_titles.get(post_id), views) for post_id, views in totals.items()])
+
+ANALYTICS_QUEUE_SIZE = int(os.environ.get('ANALYTICS_QUEUE_SIZE', 10000))
+ANALYTICS_BATCH_SIZE = int(os.environ.get('ANALYTICS_BATCH_SIZE', 200))
+ANALYTICS_FLUSH_INTERVAL = float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', 2.0))
+
+class AnalyticsWriter:
+    """Write-behind buffer for analytics events.
+
+    Requests only put rows on a queue bounded by event count. A background
+    thread drains it and inserts rows with executemany, one transaction per
+    batch, flushing when a batch fills up or the flush interval passes. Rows
+    submitted together are always written in the same transaction. When the
+    queue is full new events are dropped and counted rather than blocking
+    requests.
+    """
+
+    INSERT_SQL = '''
+        INSERT INTO analytics_events
+        (event_type, event_data, page_url, user_agent, ip_address, post_id, post_title, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    def __init__(self, maxsize=ANALYTICS_QUEUE_SIZE, batch_size=ANALYTICS_BATCH_SIZE,
+                 flush_interval=ANALYTICS_FLUSH_INTERVAL):
+        # Bounded by queued events, not submissions: a batch can carry many
+        self.maxsize = maxsize
+        self.queue = queue.Queue()
+        self._queued = 0
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+
+    def submit(self, row):
+        return self.submit_many([row])
+
+    def submit_many(self, rows):
+        self._ensure_started()
+        with self._lock:
+            if self._queued + len(rows) > self.maxsize:
+                self.dropped += len(rows)
+                return False
+            self._queued += len(rows)
+        self.queue.put_nowait(rows)
+        self.enqueued += len(rows)
+        return True
+
+    def _take(self, rows):
+        with self._lock:
+            self._queued -= len(rows)
+        return rows
+
+    def _ensure_started(self):
+        # Started lazily so the thread belongs to the worker process, not a
+        # pre-fork master.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+
+    def _collect(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.extend(self._take(self.queue.get(timeout=timeout)))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, rows):
+        try:
+            with db.connection() as conn, conn:
+                conn.executemany(self.INSERT_SQL, rows)
+                update_analytics_rollups(conn, rows)
+            self.written += len(rows)
+            self.batches += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"Analytics write error ({len(rows)} events lost): {e}")
+
+    def flush(self):
+        rows = []
+        while True:
+            try:
+                rows.extend(self._take(self.queue.get_nowait()))
+            except queue.Empty:
+                break
+        if rows:
+            self._write(rows)
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def stats(self):
+        return {
+            'queued_submissions': self.queue.qsize(),
+            'queued_events': self._queued,
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+            'written': self.written,
+            'batches': self.batches,
+            'errors': self.errors
+        }
+
+analytics_writer = AnalyticsWriter()
+atexit.register(analytics_writer.close)
+
 @app.route('/api/track-analytics', methods=['POST'])
 def track_analytics():
     try:
         data = request.json
-        
-        conn = sqlite3.connect('blog.db')
-        c = conn.cursor()
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS analytics_events (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_type TEXT,
-                event_data TEXT,
-                page_url TEXT,
-                user_agent TEXT,
-                ip_address TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
 
-        c.execute('''
-            INSERT INTO analytics_events 
-            (event_type, event_data, page_url, user_agent, ip_address)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            data.get('event'),
-            json.dumps(data),
-            request.referrer,
-            request.user_agent.string,
-            request.remote_addr
-        ))
-        
-        conn.commit()
-        conn.close()
+        queued = analytics_writer.submit(analytics_row(data))
+        if not queued:
+            return jsonify({'success': False, 'error': 'Analytics queue full'}), 503
         
         return jsonify({'success': True})
     except Exception as e:
         print(f"Analytics error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+ANALYTICS_MAX_BATCH_EVENTS = 100
+ANALYTICS_MAX_EVENT_BYTES = 4096
+
+@app.route('/api/track-analytics/batch', methods=['POST'])
+def track_analytics_batch():
+    # navigator.sendBeacon may not send a JSON content type, so parse regardless
+    data = request.get_json(force=True, silent=True)
+    events = data.get('events') if isinstance(data, dict) else data
+    if not isinstance(events, list):
+        return jsonify({'success': False, 'error': 'Expected a list of events'}), 400
+    if len(events) > ANALYTICS_MAX_BATCH_EVENTS:
+        return jsonify({'success': False, 'error': f'At most {ANALYTICS_MAX_BATCH_EVENTS} events per batch'}), 413
+
+    rows = []
+    for event in events:
+        if not isinstance(event, dict) or not isinstance(event.get('event'), str):
+            continue
+        row = analytics_row(event)
+        if len(row[1]) > ANALYTICS_MAX_EVENT_BYTES:
+            continue
+        rows.append(row)
+
+    if rows and not analytics_writer.submit_many(rows):
+        return jsonify({'success': False, 'error': 'Analytics queue full'}), 503
+
+    return jsonify({'success': True, 'accepted': len(rows), 'rejected': len(events) - len(rows)})
+
 @app.route('/api/get-analytics')
 def get_analytics():
-    conn = sqlite3.connect('blog.db')
-    c = conn.cursor()
+    days = min(max(request.args.get('days', 1, type=int), 1), 366)
+    now = datetime.now(pytz.utc)
+    since = (now - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    since_hour = (now - timedelta(hours=23)).strftime('%Y-%m-%d %H:00')
 
-    c.execute('''
-        SELECT 
-            COUNT(*) as total_visits,
-            COUNT(DISTINCT ip_address) as unique_visitors,
-            SUM(CASE WHEN event_type = 'page_view' THEN 1 ELSE 0 END) as page_views,
-            SUM(CASE WHEN event_type = 'view_post' THEN 1 ELSE 0 END) as post_views
-        FROM analytics_events 
-        WHERE DATE(created_at) = DATE('now')
-    ''')
-    today_stats = c.fetchone()
+    with db.connection() as conn:
+        c = conn.cursor()
 
-    c.execute('''
-        SELECT 
-            json_extract(event_data, '$.post_title') as post_title,
-            COUNT(*) as views
-        FROM analytics_events 
-        WHERE event_type = 'view_post'
-        GROUP BY json_extract(event_data, '$.post_id')
-        ORDER BY views DESC
-        LIMIT 5
-    ''')
-    top_posts = c.fetchall()
-    
-    conn.close()
+        c.execute('''
+            SELECT 
+                SUM(total_visits),
+                SUM(unique_visitors),
+                SUM(page_views),
+                SUM(post_views)
+            FROM analytics_daily 
+            WHERE day >= ?
+        ''', (since,))
+        today_stats = c.fetchone()
+        unique_visitors = today_stats[1] or 0
+        if days > 1:
+            # Daily uniques cannot be summed: a returning visitor is in several days
+            c.execute('SELECT COUNT(DISTINCT ip_address) FROM analytics_daily_visitors WHERE day >= ?',
+                      (since,))
+            unique_visitors = c.fetchone()[0]
+
+        c.execute('''
+            SELECT MAX(post_title), SUM(views) as views
+            FROM post_views_daily
+            WHERE day >= ?
+            GROUP BY post_id
+            ORDER BY views DESC
+            LIMIT 5
+        ''', (since,))
+        top_posts = c.fetchall()
+
+        c.execute('''
+            SELECT post_title, views
+            FROM post_view_totals
+            ORDER BY views DESC
+            LIMIT 5
+        ''')
+        all_time_top_posts = c.fetchall()
+
+        # Always the last 24 hours, whatever `days` is
+        c.execute('''
+            SELECT hour, SUM(events), SUM(CASE WHEN event_type = 'page_view' THEN events ELSE 0 END),
+                   SUM(CASE WHEN event_type = 'view_post' THEN events ELSE 0 END)
+            FROM analytics_hourly
+            WHERE hour >= ?
+            GROUP BY hour
+            ORDER BY hour
+        ''', (since_hour,))
+        hourly = c.fetchall()
     
     return jsonify({
         'today': {
             'total_visits': today_stats[0] or 0,
-            'unique_visitors': today_stats[1] or 0,
+            'unique_visitors': unique_visitors,
             'page_views': today_stats[2] or 0,
             'post_views': today_stats[3] or 0
         },
+        'days': days,
         'top_posts': [
             {'title': post[0] or 'Unknown', 'views': post[1]} 
             for post in top_posts
+        ],
+        'all_time_top_posts': [
+            {'title': post[0] or 'Unknown', 'views': post[1]}
+            for post in all_time_top_posts
+        ],
+        'hourly': [
+            {'hour': hour, 'total_visits': events, 'page_views': page_views, 'post_views': post_views}
+            for hour, events, page_views, post_views in hourly
         ]
     })
 
@@ -604,6 +3615,11 @@ def generate_seo_meta(title=None, description=None, keywords=None, image=None):
         'seo_image': image or url_for('static', filename='images/og-default.jpg', _external=True)
     }
 
+IGNORED_CATEGORIES = {'uncategorized', 'general'}
+CATEGORY_KEYWORDS = ['linux', 'python', 'tutorial', 'web', 'devops', 'ai', 'programming', 'beginners']
+# One scan of the title instead of a substring search per keyword
+CATEGORY_KEYWORD_RE = re.compile('|'.join(CATEGORY_KEYWORDS))
+
 def extract_categories(entry):
     categories = []
     cat_data = entry.get('category', [])
@@ -611,15 +3627,13 @@ def extract_categories(entry):
         for cat in cat_data:
             if isinstance(cat, dict) and 'term' in cat:
                 cat_name = cat['term'].strip('"')
-                if cat_name and cat_name.lower() not in ['uncategorized', 'general']:
+                if cat_name and cat_name.lower() not in IGNORED_CATEGORIES:
                     categories.append(cat_name)
 
     if not categories:
         title = entry.get('title', {}).get('$t', '').lower()
-        common_tags = ['linux', 'python', 'tutorial', 'web', 'devops', 'ai', 'programming', 'beginners']
-        for tag in common_tags:
-            if tag in title:
-                categories.append(tag.capitalize())
+        found = set(CATEGORY_KEYWORD_RE.findall(title))
+        categories = [tag.capitalize() for tag in CATEGORY_KEYWORDS if tag in found]
     
     return categories[:3] 
 
@@ -652,41 +3666,80 @@ def generate_blog_post_schema(post):
         }
     }
 
-@app.route('/sitemap.xml')
-def sitemap():
-    posts = get_blogger_posts()
-    base_url = request.host_url.rstrip('/')
+SITEMAP_MAX_URLS = 50000
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+SITEMAP_STATIC_URLS = 4
 
-    urls = [
-        {'loc': f'{base_url}/', 'changefreq': 'daily', 'priority': '1.0'},
-        {'loc': f'{base_url}/blog', 'changefreq': 'daily', 'priority': '0.9'},
-        {'loc': f'{base_url}/contact', 'changefreq': 'monthly', 'priority': '0.7'},
-        {'loc': f'{base_url}/search', 'changefreq': 'weekly', 'priority': '0.6'},
-    ]
-    
+def sitemap_lastmod(post):
+    # Blogger stamps are already W3C datetimes; never report "now"
+    return post.get('updated') or post.get('published') or None
+
+def newest_lastmod(posts):
+    stamps = []
+    for post in posts:
+        stamp = sitemap_lastmod(post)
+        if stamp:
+            try:
+                stamps.append((datetime.fromisoformat(stamp.replace('Z', '+00:00')), stamp))
+            except ValueError:
+                continue
+    return max(stamps)[1] if stamps else None
+
+def sitemap_entries(base_url, posts):
+    newest = newest_lastmod(posts)
+    yield {'loc': f'{base_url}/', 'lastmod': newest, 'changefreq': 'daily', 'priority': '1.0'}
+    yield {'loc': f'{base_url}/blog', 'lastmod': newest, 'changefreq': 'daily', 'priority': '0.9'}
+    yield {'loc': f'{base_url}/contact', 'changefreq': 'monthly', 'priority': '0.7'}
+    yield {'loc': f'{base_url}/search', 'changefreq': 'weekly', 'priority': '0.6'}
     for post in posts:
-        urls.append({
-            'loc': f'{base_url}/post/{post["id"]}',
-            'lastmod': datetime.now().strftime('%Y-%m-%d'),
+        yield {
+            'loc': f'{base_url}/post/{quote(post["id"])}',
+            'lastmod': sitemap_lastmod(post),
             'changefreq': 'monthly',
             'priority': '0.8'
-        })
+        }
 
-    xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-    
-    for url in urls:
-        xml += '  <url>\n'
-        xml += f'    <loc>{url["loc"]}</loc>\n'
-        if 'lastmod' in url:
-            xml += f'    <lastmod>{url["lastmod"]}</lastmod>\n'
-        xml += f'    <changefreq>{url["changefreq"]}</changefreq>\n'
-        xml += f'    <priority>{url["priority"]}</priority>\n'
-        xml += '  </url>\n'
-    
-    xml += '</urlset>'
-    
-    return Response(xml, mimetype='application/xml')
+def sitemap_page_count(posts):
+    return max(1, math.ceil((SITEMAP_STATIC_URLS + len(posts)) / SITEMAP_MAX_URLS))
+
+def generate_urlset(entries):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+    for entry in entries:
+        lastmod = f'<lastmod>{escape(entry["lastmod"])}</lastmod>' if entry.get('lastmod') else ''
+        yield (f'<url><loc>{escape(entry["loc"])}</loc>{lastmod}'
+               f'<changefreq>{entry["changefreq"]}</changefreq>'
+               f'<priority>{entry["priority"]}</priority></url>\n')
+    yield '</urlset>\n'
+
+def generate_sitemap_index(base_url, posts):
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'
+    for page in range(1, sitemap_page_count(posts) + 1):
+        # Page 1 starts with the static pages, so post slices are offset by them
+        start = max(0, (page - 1) * SITEMAP_MAX_URLS - SITEMAP_STATIC_URLS)
+        end = page * SITEMAP_MAX_URLS - SITEMAP_STATIC_URLS
+        lastmod = newest_lastmod(posts[start:end])
+        lastmod = f'<lastmod>{escape(lastmod)}</lastmod>' if lastmod else ''
+        yield f'<sitemap><loc>{base_url}/sitemap-{page}.xml</loc>{lastmod}</sitemap>\n'
+    yield '</sitemapindex>\n'
+
+@app.route('/sitemap.xml')
+@cached_page
+def sitemap():
+    posts = get_blogger_posts()
+    base_url = request.host_url.rstrip('/')
+    return Response(generate_sitemap_index(base_url, posts), mimetype='application/xml')
+
+@app.route('/sitemap-<int:page>.xml')
+@cached_page
+def sitemap_page(page):
+    posts = get_blogger_posts()
+    if not 1 <= page <= sitemap_page_count(posts):
+        abort(404)
+    base_url = request.host_url.rstrip('/')
+    entries = islice(sitemap_entries(base_url, posts), (page - 1) * SITEMAP_MAX_URLS, page * SITEMAP_MAX_URLS)
+    # Streamed on a cache miss; cached_page keeps the joined, precompressed
+    # body for the rest of this feed version.
+    return Response(generate_urlset(entries), mimetype='application/xml')
 
 @app.route('/robots.txt')
 def robots():
@@ -709,8 +3762,10 @@ def add_security_headers(response):
 @app.after_request
 def add_cache_headers(response):
     if request.endpoint == 'static':
-        response.cache_control.max_age = 31536000 
-    elif request.endpoint in ['home', 'blog', 'post_detail']:
+        # Unversioned URLs; built CSS/JS is served from /static/dist instead
+        response.cache_control.max_age = 86400
+        response.cache_control.no_cache = None
+    elif request.endpoint in ['home', 'blog', 'category', 'post_detail', 'sitemap', 'sitemap_page']:
         response.cache_control.max_age = 300  
     return response
 
@@ -0,0 +1,432 @@
+"""Load-test the main routes against a local stand-in for the Blogger feed.
+
+    python benchmark.py                         # test client and gunicorn
+    python benchmark.py --mode client --posts 2000 --latency 150
+    python benchmark.py --compare bench_results/<earlier run>.json
+
+A fake Blogger JSON feed is served on localhost with a configurable number
+of posts and response latency, and the app is pointed at it through
+BLOGGER_URL with a throwaway database. Each route is then driven through the
+Flask test client (in process) and/or a real gunicorn started with
+gunicorn_config.py. Latency percentiles, throughput and memory are printed
+and saved under bench_results/ keyed by the current commit so runs can be
+compared across commits.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import requests
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(ROOT, 'bench_results')
+
+TOPICS = ['linux', 'python', 'docker', 'flask', 'kubernetes', 'git', 'bash', 'networking',
+          'security', 'javascript', 'databases', 'devops', 'ai', 'rust', 'cloud']
+CATEGORIES = ['Linux', 'Python', 'DevOps', 'Web', 'AI', 'Tutorial', 'Security']
+FILLER = ('install configure server command terminal package kernel process memory '
+          'network file system container image build deploy script function module '
+          'request response cache query index thread worker socket port shell user').split()
+SEARCH_TERMS = ['linux', 'docker container', 'python flask', 'kernel memory', 'deploy',
+                'git', 'security network', 'nonexistentterm']
+BLOG_PAGE_SIZE = 12  # app.BLOG_PAGE_SIZE; /blog 404s past the last page
+
+
+# --- Fake Blogger feed ------------------------------------------------------
+
+class FakeBlogger:
+    """Deterministic in-memory feed served over HTTP like Blogger's JSON API."""
+
+    def __init__(self, post_count, latency_ms, seed=1):
+        self.latency = latency_ms / 1000.0
+        self.requests = 0
+        rng = random.Random(seed)
+        now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.entries = [self._entry(rng, number, now - timedelta(hours=6 * number))
+                        for number in range(post_count)]
+        self.by_id = {str(1000 + number): entry for number, entry in enumerate(self.entries)}
+        self.etag = f'W/"feed-{post_count}-{seed}"'
+        self.server = None
+
+    @staticmethod
+    def _entry(rng, number, published):
+        topic = rng.choice(TOPICS)
+        paragraphs = ''.join(
+            '<p>' + ' '.join(rng.choice(FILLER + [topic]) for _ in range(rng.randint(40, 90))) + '</p>'
+            for _ in range(rng.randint(3, 8))
+        )
+        body = (f'<div class="separator"><a href="https://blogger.googleusercontent.com/img/b/{number}/s1600/{topic}.png">'
+                f'<img src="https://blogger.googleusercontent.com/img/b/{number}/w400-h225/{topic}.png" /></a></div>'
+                f'{paragraphs}<pre><code>$ {topic} --help &amp;&amp; echo done</code></pre>')
+        stamp = published.strftime('%Y-%m-%dT%H:%M:%S.000+00:00')
+        return {
+            'id': {'$t': f'tag:blogger.com,1999:blog-1.post-{1000 + number}'},
+            'title': {'$t': f'{topic.capitalize()} guide part {number}: {rng.choice(FILLER)} and {rng.choice(FILLER)}'},
+            'content': {'$t': body},
+            'published': {'$t': stamp},
+            'updated': {'$t': stamp},
+            'category': [{'term': term} for term in rng.sample(CATEGORIES, 2)],
+            'link': [{'rel': 'alternate', 'href': f'https://example.blogspot.com/{number}.html'}],
+        }
+
+    def _handler(self):
+        feed = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                feed.requests += 1
+                if feed.latency:
+                    time.sleep(feed.latency)
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                parts = url.path.rstrip('/').split('/')
+
+                if parts[-1] != 'default':
+                    entry = feed.by_id.get(parts[-1])
+                    if entry is None:
+                        return self._send(404, {'error': 'not found'})
+                    return self._send(200, {'entry': entry})
+
+                if self.headers.get('If-None-Match') == feed.etag:
+                    return self._send(304, None)
+                entries = feed.entries
+                if query.get('updated-min'):
+                    entries = [e for e in entries if e['updated']['$t'] >= query['updated-min']]
+                start = int(query.get('start-index', 1))
+                size = int(query.get('max-results', 25))
+                self._send(200, {'feed': {
+                    'openSearch$totalResults': {'$t': str(len(entries))},
+                    'entry': entries[start - 1:start - 1 + size],
+                }})
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode() if payload is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('ETag', feed.etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+# --- Routes under test ------------------------------------------------------
+
+def build_routes(post_count):
+    post_ids = [f'post-{1000 + number}' for number in range(post_count)]
+    blog_pages = max(1, min(5, math.ceil(post_count / BLOG_PAGE_SIZE)))
+    return {
+        'home': lambda i: ('GET', '/', None),
+        'blog': lambda i: ('GET', f'/blog?page={i % blog_pages + 1}', None),
+        'post': lambda i: ('GET', f'/post/{post_ids[i % len(post_ids)]}', None),
+        'search': lambda i: ('GET', f'/search?q={SEARCH_TERMS[i % len(SEARCH_TERMS)]}', None),
+        'track': lambda i: ('POST', '/api/track-analytics', {
+            'event': 'page_view', 'page_url': f'/post/{post_ids[i % len(post_ids)]}',
+            'post_id': post_ids[i % len(post_ids)], 'timestamp': datetime.now().isoformat(),
+        }),
+    }
+
+
+# --- Measurement ------------------------------------------------------------
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    rank = max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+def rss_mb(pid):
+    # Resident set size from /proc (Linux); None elsewhere
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024.0, 1)
+    except OSError:
+        return None
+    return None
+
+def process_tree(pid):
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as children:
+            for child in children.read().split():
+                pids.extend(process_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+def tree_rss_mb(pid):
+    sizes = [rss_mb(p) for p in process_tree(pid)]
+    sizes = [size for size in sizes if size is not None]
+    return round(sum(sizes), 1) if sizes else None
+
+def wait_for_feed(send, routes, started, alive=lambda: True, timeout=60):
+    # The feed may still be syncing in the background after the first
+    # response, so wait until a real post resolves before measuring.
+    while not send(*routes['post'](0)):
+        if not alive() or time.perf_counter() - started > timeout:
+            raise RuntimeError('the app never loaded the fake feed')
+        time.sleep(0.1)
+    return round(time.perf_counter() - started, 2)
+
+def run_load(send, route, count, concurrency, warmup):
+    for i in range(warmup):
+        send(*route(i))
+
+    def timed(i):
+        started = time.perf_counter()
+        ok = send(*route(i))
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(timed, range(count)))
+    else:
+        samples = [timed(i) for i in range(count)]
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency * 1000 for latency, _ in samples)
+    return {
+        'requests': count,
+        'errors': sum(1 for _, ok in samples if not ok),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'max_ms': round(latencies[-1], 2),
+        'throughput_rps': round(count / elapsed, 1) if elapsed else None,
+    }
+
+
+# --- Drivers ----------------------------------------------------------------
+
+def app_environment(feed_url, workdir):
+    env = dict(os.environ)
+    env.update({
+        'BLOGGER_URL': feed_url,
+        'DATABASE_PATH': os.path.join(workdir, 'bench.db'),
+        'SECRET_KEY': env.get('SECRET_KEY', 'benchmark'),
+    })
+    return env
+
+def bench_client(args, feed_url, routes, workdir):
+    # The app reads its configuration at import time, so set it up first
+    os.environ.update(app_environment(feed_url, workdir))
+    sys.path.insert(0, ROOT)
+    started = time.perf_counter()
+    import app as blog_app
+    import_s = time.perf_counter() - started
+
+    local = threading.local()
+
+    def send(method, path, payload):
+        if not hasattr(local, 'client'):
+            local.client = blog_app.app.test_client()
+        response = local.client.open(path, method=method, json=payload)
+        response.close()
+        return response.status_code < 400
+
+    started = time.perf_counter()
+    send('GET', '/', None)
+    cold_ms = (time.perf_counter() - started) * 1000
+    ready_s = wait_for_feed(send, routes, started)
+
+    results = {}
+    for name in args.routes:
+        stats = run_load(send, routes[name], args.requests, args.client_concurrency, args.warmup)
+        stats['rss_mb'] = rss_mb(os.getpid())
+        results[name] = stats
+    return {'import_s': round(import_s, 3), 'cold_home_ms': round(cold_ms, 1), 'feed_ready_s': ready_s,
+            'routes': results}
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def bench_gunicorn(args, feed_url, routes, workdir):
+    port = free_port()
+    env = app_environment(feed_url, workdir)
+    env['PORT'] = str(port)
+    if args.workers:
+        env['WEB_CONCURRENCY'] = str(args.workers)
+    if args.worker_class:
+        env['GUNICORN_WORKER_CLASS'] = args.worker_class
+
+    log = open(os.path.join(workdir, 'gunicorn.log'), 'w')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', 'app:app'],
+                              cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base = f'http://127.0.0.1:{port}'
+    local = threading.local()
+
+    def send(method, path, payload):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        try:
+            response = local.session.request(method, base + path, json=payload, timeout=60)
+        except requests.RequestException:
+            return False
+        return response.status_code < 400
+
+    try:
+        started = time.perf_counter()
+        deadline = started + 60
+        while not send('GET', '/', None):
+            if server.poll() is not None or time.perf_counter() > deadline:
+                raise RuntimeError(f'gunicorn did not come up; see {log.name}')
+            time.sleep(0.1)
+        cold_ms = (time.perf_counter() - started) * 1000
+        ready_s = wait_for_feed(send, routes, started, alive=lambda: server.poll() is None)
+
+        results = {}
+        for name in args.routes:
+            stats = run_load(send, routes[name], args.requests, args.concurrency, args.warmup)
+            stats['rss_mb'] = tree_rss_mb(server.pid)
+            results[name] = stats
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        log.close()
+
+    return {'cold_home_ms': round(cold_ms, 1), 'feed_ready_s': ready_s,
+            'worker_class': env.get('GUNICORN_WORKER_CLASS', 'sync'),
+            'routes': results}
+
+
+# --- Reporting --------------------------------------------------------------
+
+COLUMNS = ('requests', 'errors', 'p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'rss_mb')
+
+def git_revision():
+    def git(*cmd):
+        return subprocess.run(['git', *cmd], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    try:
+        commit = git('rev-parse', '--short', 'HEAD') or 'unknown'
+        dirty = bool(git('status', '--porcelain', '--untracked-files=no'))
+    except OSError:
+        return 'unknown', False
+    return commit, dirty
+
+def print_report(report, baseline=None):
+    print(f"\ncommit {report['commit']}{' (dirty)' if report['dirty'] else ''}  "
+          f"posts={report['config']['posts']} latency={report['config']['latency_ms']}ms")
+    for mode, result in report['modes'].items():
+        print(f"\n[{mode}] cold GET / {result['cold_home_ms']} ms, feed ready after {result.get('feed_ready_s')} s")
+        print(f"{'route':<8}" + ''.join(f'{column:>16}' for column in COLUMNS))
+        for route, stats in result['routes'].items():
+            before = (baseline or {}).get('modes', {}).get(mode, {}).get('routes', {}).get(route, {})
+            cells = []
+            for column in COLUMNS:
+                value = stats.get(column)
+                cell = '-' if value is None else f'{value:g}'
+                if before.get(column) and value is not None and column not in ('requests', 'errors'):
+                    cell += f' ({(value - before[column]) / before[column]:+.0%})'
+                cells.append(f'{cell:>16}')
+            print(f'{route:<8}' + ''.join(cells))
+
+def save_report(report):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    name = f"{report['commit']}{'-dirty' if report['dirty'] else ''}-{stamp}.json"
+    path = os.path.join(RESULTS_DIR, name)
+    with open(path, 'w') as output:
+        json.dump(report, output, indent=2)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--mode', choices=('client', 'gunicorn', 'both'), default='both')
+    parser.add_argument('--posts', type=int, default=500, help='posts in the fake feed')
+    parser.add_argument('--latency', type=float, default=50, help='fake feed latency in ms')
+    parser.add_argument('--requests', type=int, default=200, help='measured requests per route')
+    parser.add_argument('--warmup', type=int, default=5, help='unmeasured requests per route')
+    parser.add_argument('--concurrency', type=int, default=16, help='client threads against gunicorn')
+    parser.add_argument('--client-concurrency', type=int, default=1, help='threads against the test client')
+    parser.add_argument('--workers', type=int, help='override WEB_CONCURRENCY for gunicorn')
+    parser.add_argument('--worker-class', choices=('sync', 'gevent'), help='override GUNICORN_WORKER_CLASS')
+    parser.add_argument('--routes', default='home,blog,post,search,track',
+                        help='comma separated subset of home,blog,post,search,track')
+    parser.add_argument('--compare', help='earlier results file to show deltas against')
+    parser.add_argument('--no-save', action='store_true', help='do not write bench_results/')
+    args = parser.parse_args()
+
+    routes = build_routes(args.posts)
+    args.routes = [name.strip() for name in args.routes.split(',') if name.strip()]
+    unknown = set(args.routes) - set(routes)
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+
+    feed = FakeBlogger(args.posts, args.latency)
+    feed_url = feed.start()
+    commit, dirty = git_revision()
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'config': {'posts': args.posts, 'latency_ms': args.latency, 'requests': args.requests,
+                   'concurrency': args.concurrency, 'client_concurrency': args.client_concurrency},
+        'modes': {},
+    }
+
+    try:
+        # gunicorn runs first so the in-process import cannot leak into it
+        if args.mode in ('gunicorn', 'both'):
+            with tempfile.TemporaryDirectory() as workdir:
+                report['modes']['gunicorn'] = bench_gunicorn(args, feed_url, routes, workdir)
+        if args.mode in ('client', 'both'):
+            with tempfile.TemporaryDirectory() as workdir:
+                report['modes']['client'] = bench_client(args, feed_url, routes, workdir)
+                # Let the app's background writers finish before the directory goes
+                blog_app = sys.modules.get('app')
+                if blog_app is not None:
+                    blog_app.analytics_writer.close()
+                    blog_app.view_counter.close()
+    finally:
+        feed.stop()
+
+    report['feed_requests'] = feed.requests
+    baseline = None
+    if args.compare:
+        with open(args.compare) as previous:
+            baseline = json.load(previous)
+    print_report(report, baseline)
+    if not args.no_save:
+        print(f'\nsaved {save_report(report)}')
+
+
+if __name__ == '__main__':
+    main()
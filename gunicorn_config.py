@@ -1,6 +1,27 @@
-bind = "0.0.0.0:10000"
-workers = 2
-threads = 4
-worker_class = "sync"
+import multiprocessing
+import os
+
+# Serving modes:
+#   sync   - threaded workers (gunicorn switches to gthread when threads > 1)
+#   gevent - one event loop per worker; Blogger calls and slow clients only
+#            park a greenlet, so each worker handles hundreds of connections.
+#            CPU-bound work (content processing, index builds) and SQLite
+#            waits still block the whole worker, so this is opt-in.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', "sync")
+
+cpu_count = multiprocessing.cpu_count()
+max_workers = int(os.environ.get('GUNICORN_MAX_WORKERS', 8))
+
+if worker_class == "gevent":
+    # Concurrency comes from greenlets, so one worker per core is enough
+    workers = int(os.environ.get('WEB_CONCURRENCY', min(cpu_count, max_workers)))
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+    threads = 1
+else:
+    workers = int(os.environ.get('WEB_CONCURRENCY', min(cpu_count * 2 + 1, max_workers)))
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 10000)}"
 timeout = 120
-keepalive = 5
\ No newline at end of file
+graceful_timeout = 30
+keepalive = 5
@@ -3,6 +3,11 @@ class AnalyticsTracker {
     constructor() {
         this.trackingId = 'G-4C23MR10FW'; // Your Measurement ID
         this.isInitialized = false;
+        this.batchUrl = '/api/track-analytics/batch';
+        this.buffer = [];
+        this.maxBatchSize = 20;
+        this.flushInterval = 10000; // ms
+        this.flushTimer = null;
         this.init();
     }
 
@@ -80,13 +85,41 @@ class AnalyticsTracker {
     }
 
     sendToServer(data) {
-        // Send to your Flask backend for analytics
-        fetch('/api/track-analytics', {
+        // Buffer events and send them to the Flask backend in batches
+        this.buffer.push(data);
+        if (this.buffer.length >= this.maxBatchSize) {
+            this.flush();
+        } else if (!this.flushTimer) {
+            this.flushTimer = setTimeout(() => this.flush(), this.flushInterval);
+        }
+    }
+
+    flush(useBeacon = false) {
+        if (this.flushTimer) {
+            clearTimeout(this.flushTimer);
+            this.flushTimer = null;
+        }
+        if (this.buffer.length === 0) {
+            return;
+        }
+
+        const body = JSON.stringify({ events: this.buffer.splice(0, this.buffer.length) });
+
+        // sendBeacon survives page unload; fall back to a keepalive fetch
+        if (useBeacon && navigator.sendBeacon) {
+            const blob = new Blob([body], { type: 'application/json' });
+            if (navigator.sendBeacon(this.batchUrl, blob)) {
+                return;
+            }
+        }
+
+        fetch(this.batchUrl, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify(data)
+            body: body,
+            keepalive: true
         }).catch(console.error);
     }
 
@@ -131,6 +164,14 @@ class AnalyticsTracker {
                 this.trackUserEngagement(timeSpent);
             }
         });
+
+        // Flush buffered events when the page is hidden or unloaded
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'hidden') {
+                this.flush(true);
+            }
+        });
+        window.addEventListener('pagehide', () => this.flush(true));
     }
 }
 
@@ -100,6 +100,11 @@ function setupAnalytics() {
 function trackPageView() {
     const path = window.location.pathname;
     console.log(`[Analytics] Page view: ${path}`);
+
+    // Post pages are already counted by the server when they are rendered
+    if (path.startsWith('/post/')) {
+        return;
+    }
     
     // Send to your analytics endpoint
     fetch('/api/track-view', {
@@ -159,7 +164,7 @@ async function searchPosts(event) {
     }
     
     try {
-        const response = await fetch(`/api/all-posts`);
+        const response = await fetch(`/api/all-posts?fields=id,title,preview`);
         const data = await response.json();
         
         posts.forEach(post => {
@@ -183,7 +188,7 @@ async function loadMorePosts() {
     btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Loading...';
     
     try {
-        const response = await fetch(`/api/paginated-posts?page=${currentPage + 1}`);
+        const response = await fetch(`/api/paginated-posts?page=${currentPage + 1}&fields=id,title,preview,date,thumbnail`);
         const data = await response.json();
         
         if (data.success && data.posts.length > 0) {
@@ -218,7 +223,7 @@ function createPostHTML(post) {
                 <span class="post-date">${post.date}</span>
             </div>
             <h3 class="post-title">${post.title}</h3>
-            <p class="post-excerpt">${post.content.substring(0, 150)}...</p>
+            <p class="post-excerpt">${post.preview.substring(0, 150)}...</p>
             <a href="/post/${post.id}" class="btn btn-outline">
                 Read Article <i class="fas fa-arrow-right"></i>
             </a>